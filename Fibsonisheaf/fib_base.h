@@ -55,4 +55,10 @@ struct number {
 // See impl/README.md for an explanation of the function's expected behaviour.
 struct number fibonacci(uint64_t index);
 
+// Products of little-endian numbers of `a_len` (and `b_len`) bytes, returned
+// like the result of `fibonacci` (or with NULL bytes, if too large for the
+// implementation). Only provided by impl/ntt.c and impl/nttt.c.
+struct number ntt_mul(void const *a, size_t a_len, void const *b, size_t b_len);
+struct number ntt_sqr(void const *a, size_t a_len);
+
 #endif // FIB_BASE_H
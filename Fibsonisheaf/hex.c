@@ -7,9 +7,61 @@
 #define CLOCK CLOCK_MONOTONIC
 #endif
 
+#define HEX_BUFFER_SIZE (1 << 16)
+
+// Raw output (`-b`): this header, then the result as little-endian bytes.
+// `endianness` is the byte order of the header fields ('l' or 'b').
+// Mirrored by scripts/fibonappy/raw.py.
+struct raw_header {
+  char magic[6];
+  uint8_t version;
+  char endianness;
+  uint64_t index;
+  uint64_t length;
+};
+
+static void write_raw(FILE *file, uint64_t index, uint8_t *bytes,
+                      size_t length) {
+  uint16_t aabb = 0xAABB;
+  struct raw_header header = {
+      .magic = {'F', 'I', 'B', 'R', 'A', 'W'},
+      .version = 1,
+      .endianness = *(uint8_t *)&aabb == 0xBB ? 'l' : 'b',
+      .index = index,
+      .length = length,
+  };
+  fwrite(&header, sizeof(header), 1, file);
+  fwrite(bytes, 1, length, file);
+}
+
+static void write_hex(FILE *file, uint8_t *bytes, size_t length) {
+  static const char digits[] = "0123456789abcdef";
+  char table[256][2];
+  for (int i = 0; i < 256; ++i) {
+    table[i][0] = digits[i >> 4];
+    table[i][1] = digits[i & 0xf];
+  }
+
+  char buffer[HEX_BUFFER_SIZE];
+  size_t used = 0;
+  do {
+    memcpy(buffer + used, table[bytes[--length]], 2);
+    used += 2;
+    if (used == HEX_BUFFER_SIZE) {
+      fwrite(buffer, 1, used, file);
+      used = 0;
+    }
+  } while (length);
+  fwrite(buffer, 1, used, file);
+}
+
 int main(int argc, char *argv[]) {
+  int binary = argc > 1 && strcmp(argv[1], "-b") == 0;
+  argc -= binary;
+  argv += binary;
+
   if (argc < 2 || argc > 3) {
-    fprintf(stderr, "Usage: %s index [output.hex]\n", argv[0]);
+    fprintf(stderr, "Usage: %s [-b] index [output.hex]\n", argv[-binary]);
     return EXIT_FAILURE;
   }
 
@@ -20,7 +72,7 @@ int main(int argc, char *argv[]) {
     return EXIT_FAILURE;
   }
 
-  FILE *output_file = argc == 3 ? fopen(argv[2], "w") : stdout;
+  FILE *output_file = argc == 3 ? fopen(argv[2], binary ? "wb" : "w") : stdout;
   if (output_file == NULL) {
     fprintf(stderr, "Failed to open file: %s\n", argv[2]);
     return EXIT_FAILURE;
@@ -50,15 +102,17 @@ int main(int argc, char *argv[]) {
           (long long unsigned)(delta.tv_sec),
           (long long unsigned)(delta.tv_nsec), (long long unsigned)length);
 
-  do {
-    fprintf(output_file, "%02x", bytes[--length]);
-  } while (length);
+  if (binary) {
+    write_raw(output_file, index, bytes, length);
+  } else {
+    write_hex(output_file, bytes, length);
+  }
 
   free(bytes);
 
   if (argc == 3) {
     fclose(output_file);
-  } else {
+  } else if (!binary) {
     putc('\n', stdout);
   }
 
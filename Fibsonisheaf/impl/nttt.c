@@ -458,3 +458,114 @@ struct number fibonacci(uint64_t index) {
   free(b_post);
   return result;
 }
+
+// return the exponent of the transform length for a product of `len` radices,
+// whose shorter factor has `terms` radices (0 if it is beyond the roots of
+// unity of the header, or if the convolution would not be exact)
+static size_t product_len_log(size_t const len, size_t const terms) {
+  size_t const max_log = sizeof(root_of_unity) / sizeof(*root_of_unity) - 1;
+  // each coefficient of the convolution sums (at most) `terms` products of
+  // radices, which must stay below `prime`
+  digit_t const radix_max = ((digit_t)1 << RADIX_BIT) - 1;
+  if (terms > (prime - 1) / (radix_max * radix_max)) {
+    return 0;
+  }
+  size_t len_log = len > 1 ? 64 - __builtin_clzll(len - 1) : 1;
+  return len_log <= max_log ? len_log : 0;
+}
+
+// a * b, or a^2 if `b` is NULL.
+// A square only takes a single transform each way; a product transforms both
+// factors side by side.
+static struct number ntt_product(void const *a, size_t a_len, void const *b,
+                                 size_t b_len) {
+  size_t const product_len = a_len + (b ? b_len : a_len);
+  if (!a_len || (b && !b_len)) {
+    return (struct number){.bytes = calloc(1, 1), .length = 1};
+  }
+
+  size_t const terms =
+      ceil_div(b && b_len < a_len ? b_len : a_len, sizeof(radix_t));
+  size_t const len_log =
+      product_len_log(ceil_div(product_len, sizeof(radix_t)), terms);
+  if (!len_log) {
+    return (struct number){.bytes = NULL, .length = 0};
+  }
+  size_t const len = POW2(len_log);
+
+  radix_t *a_radix = calloc(len, sizeof(radix_t));
+  radix_t *b_radix = b ? calloc(len, sizeof(radix_t)) : NULL;
+  digit_t *a_freq = malloc(len * sizeof(digit_t));
+  digit_t *b_freq = b ? malloc(len * sizeof(digit_t)) : NULL;
+  digit_t *post = malloc(len * sizeof(digit_t));
+  // (padded for the last `digit_t` window of the fold)
+  radix_t *out = calloc(len + POW2(expansion_exp), sizeof(radix_t));
+  if (!a_radix || (b && (!b_radix || !b_freq)) || !a_freq || !post || !out) {
+    free(a_radix);
+    free(b_radix);
+    free(a_freq);
+    free(b_freq);
+    free(post);
+    free(out);
+    return (struct number){.bytes = NULL, .length = 0};
+  }
+  memcpy(a_radix, a, a_len);
+
+  if (b) {
+    memcpy(b_radix, b, b_len);
+    spread_twice(a_radix, b_radix, a_freq, b_freq, len, len);
+    ntt_twice(a_freq, b_freq, root_of_unity, len_log);
+  } else {
+    (void)spread(&(struct spread_args){
+        .src = a_radix,
+        .dst = a_freq,
+        .len = len,
+        .top_bit = len,
+    });
+    (void)ntt(&(struct ntt_args){
+        .seq = a_freq,
+        .omega = root_of_unity,
+        .len_log = len_log,
+    });
+  }
+
+  digit_t const *const rhs = b ? b_freq : a_freq;
+  for (size_t i = 0, ri = 0; i < len;
+       ++i, ri = bit_reversed_increment(ri, len)) {
+    post[ri] = MOD_MUL(a_freq[i], rhs[i]);
+  }
+
+  (void)ntt(&(struct ntt_args){
+      .seq = post,
+      .omega = conj_of_unity,
+      .len_log = len_log,
+  });
+
+  (void)fold(&(struct fold_args){
+      .src = post,
+      .dst = out,
+      .len = len,
+      .len_log = len_log,
+  });
+
+  size_t length = product_len;
+  while (length > 1 && !((uint8_t *)out)[length - 1]) {
+    --length;
+  }
+
+  free(a_radix);
+  free(b_radix);
+  free(a_freq);
+  free(b_freq);
+  free(post);
+  return (struct number){.bytes = out, .length = length};
+}
+
+struct number ntt_mul(void const *a, size_t a_len, void const *b,
+                      size_t b_len) {
+  return ntt_product(a, a_len, b, b_len);
+}
+
+struct number ntt_sqr(void const *a, size_t a_len) {
+  return ntt_product(a, a_len, NULL, 0);
+}
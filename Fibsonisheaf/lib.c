@@ -0,0 +1,8 @@
+#include "fib_base.h"
+
+// Extra entry points of the shared objects (`make lib/$(algo).so`), for
+// scripts/cimpl.py and scripts/fibonappy/cntt.py: the results of `fibonacci`
+// (and of `ntt_mul` and `ntt_sqr`) must be freed by the allocator of the
+// library that produced them.
+
+void fibonacci_free(void *bytes) { free(bytes); }
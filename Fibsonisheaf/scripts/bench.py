@@ -2,16 +2,30 @@
 Really bad benchmarking script.
 """
 
+import asyncio
 import math
+import multiprocessing
 import os
 import re
-import subprocess
 import sys
 import time
 import typing
 from dataclasses import dataclass
 
-from fibonappy.fast_double import fibonacci
+import cimpl
+import frontier
+import results
+import rusage
+import sampling
+from fibonappy import cache as fibcache
+from fibonappy import raw as fibraw
+from fibonappy.lucas import fibonacci
+from fibonappy.modular import fibonacci_mod, random_primes
+from rusage import Usage
+from scheduler import Scheduler, physical_cores, threaded
+
+# number of hex digits reduced at a time when fingerprinting
+FINGERPRINT_CHUNK = 1 << 16
 
 
 def gen_indices(bases: typing.Iterable[int]):
@@ -24,53 +38,193 @@ def gen_indices(bases: typing.Iterable[int]):
             n *= base
 
 
+def hex_residues(hexdigits: bytes, moduli: typing.Sequence[int]) -> tuple[int, ...]:
+    """reduces a hex string modulo each of `moduli`, one chunk at a time"""
+    modulus = math.prod(moduli)
+    x = 0
+    for i in range(0, len(hexdigits), FINGERPRINT_CHUNK):
+        chunk = hexdigits[i : i + FINGERPRINT_CHUNK]
+        x = ((x << (4 * len(chunk))) + int(chunk, base=16)) % modulus
+    return tuple(x % mod for mod in moduli)
+
+
 @dataclass
 class Bench:
     runtime: float
-    result: int | None
+    # the result itself, or its residues when fingerprinting
+    result: int | tuple[int, ...] | None
+    # resources used by the run (in a child process)
+    usage: Usage | None = None
 
     @classmethod
-    def collect(cls, hexcmd: str, index: int, *, timeout: float = None) -> typing.Self:
-        try:
-            proc = subprocess.run(
-                [hexcmd, str(index)], timeout=timeout, capture_output=True, text=True
-            )
-        except subprocess.TimeoutExpired:
+    async def collect(
+        cls,
+        scheduler: Scheduler,
+        hexcmd: str,
+        index: int,
+        *,
+        timeout: float = None,
+        moduli: typing.Sequence[int] | None = None,
+        binary: bool = True,
+        exclusive: bool = False,
+    ) -> typing.Self:
+        args = [hexcmd, "-b", str(index)] if binary else [hexcmd, str(index)]
+        proc = await scheduler.run(args, timeout=timeout, exclusive=exclusive)
+        if proc is None:
             return cls(math.inf, -1)
 
         rtre = re.compile(r"#\s*Runtime:\s*(?P<runtime>[\d.]+)s")
-        report = rtre.search(proc.stderr)
+        report = rtre.search(proc.stderr.decode(errors="replace"))
         try:
             runtime = float(report.group("runtime"))
         except:
-            return cls(math.nan, -1)
+            return cls(math.nan, -1, proc.usage)
 
         try:
-            result = int(proc.stdout, base=16)
+            found = fibraw.read(proc.stdout)
+            if found is not None:
+                found_index, x = found
+                if found_index != index:
+                    result = None
+                elif moduli is None:
+                    result = x
+                else:
+                    result = tuple(x % mod for mod in moduli)
+            elif moduli is None:
+                result = int(proc.stdout, base=16)
+            else:
+                result = hex_residues(proc.stdout.strip(), moduli)
         except:
             result = None
-        return cls(runtime, result)
+        return cls(runtime, result, proc.usage)
 
     @classmethod
-    def golden(cls, index: int) -> typing.Self:
+    def call(
+        cls,
+        worker: cimpl.Worker,
+        index: int,
+        *,
+        timeout: float = None,
+        moduli: typing.Sequence[int] | None = None,
+    ) -> typing.Self:
+        try:
+            x, runtime_ns = worker.fibonacci(index, timeout=timeout)
+        except TimeoutError:
+            return cls(math.inf, -1)
+        except ChildProcessError:
+            return cls(math.nan, -1)
+        result = x if moduli is None else tuple(x % mod for mod in moduli)
+        return cls(runtime_ns / 1e9, result, worker.usage)
+
+    @classmethod
+    def golden(
+        cls, index: int, *, cache: fibcache.PairCache | None = None
+    ) -> typing.Self:
         start = time.time()
-        result = fibonacci(index)
+        result = fibonacci(index) if cache is None else fibcache.fibonacci(index, cache)
         end = time.time()
         return cls(end - start, result)
 
+    @classmethod
+    def fingerprint(cls, index: int, moduli: typing.Sequence[int]) -> typing.Self:
+        start = time.time()
+        result = tuple(fibonacci_mod(index, mod) for mod in moduli)
+        end = time.time()
+        return cls(end - start, result)
+
+    @classmethod
+    def reference(
+        cls,
+        index: int,
+        *,
+        timeout: float = None,
+        cache: fibcache.PairCache | None = None,
+        moduli: typing.Sequence[int] | None = None,
+    ) -> typing.Self:
+        """`golden` (or `fingerprint`, given `moduli`), in a forked child that is
+        killed if it does not return in time"""
+        ctx = multiprocessing.get_context("fork")
+        conn, child = ctx.Pipe(duplex=False)
+        proc = ctx.Process(
+            target=_reference, args=(child, index, cache, moduli), daemon=True
+        )
+        proc.start()
+        child.close()
+        try:
+            if not conn.poll(timeout):
+                return cls(math.inf, -1)
+            return conn.recv()
+        except EOFError:
+            return cls(math.nan, -1)
+        finally:
+            conn.close()
+            proc.kill()
+            proc.join()
+
 
-def mean(fn: typing.Callable[[], Bench], count: int):
-    runtime_tot = 0.0
-    for _ in range(count):
-        bench = fn()
-        if (
-            math.isnan(bench.runtime)
-            or math.isinf(bench.runtime)
-            or bench.result is None
-        ):
-            return bench
-        runtime_tot += bench.runtime
-    return Bench(runtime_tot / count, bench.result)
+def _reference(conn, index: int, cache: fibcache.PairCache | None, moduli):
+    if moduli is None:
+        conn.send(Bench.golden(index, cache=cache))
+    else:
+        conn.send(Bench.fingerprint(index, moduli))
+    conn.close()
+
+
+def failure(bench: Bench, gold: Bench | None = None) -> tuple[str, str] | None:
+    """style and label of a failed run, or None if `bench` matches `gold`"""
+    if math.isnan(bench.runtime):
+        return "\x1b[1;33m", "ERROR"
+    if math.isinf(bench.runtime):
+        return "\x1b[31m", "TIMEOUT"
+    if bench.result is None:
+        return "\x1b[1;33m", "INVALID"
+    if gold is not None and bench.result != gold.result:
+        return "\x1b[1;37;41m", "INCORRECT"
+    return None
+
+
+class Runner:
+    """runs the commands through a scheduler"""
+
+    def __init__(
+        self,
+        cmds: typing.Iterable[str],
+        *,
+        scheduler: Scheduler,
+        exclusive: typing.Collection[str] = (),
+        binary: bool = True,
+    ):
+        cmds = list(cmds)
+        self.scheduler = scheduler
+        self.binary = binary
+        # shared objects are called in-process, in (daemonic) forked workers
+        self.workers = {cmd: cimpl.Worker(cmd) for cmd in cmds if cmd.endswith(".so")}
+        # multi-threaded implementations get the whole machine to themselves
+        self.exclusive = {cmd for cmd in cmds if cmd in exclusive or threaded(cmd)}
+
+    async def measure(self, cmd: str, index: int, **kwargs) -> Bench:
+        if cmd in self.workers:
+            worker = self.workers[cmd]
+            return await self.scheduler.call(
+                Bench.call,
+                worker,
+                index,
+                pid=worker.proc.pid,
+                exclusive=cmd in self.exclusive,
+                **kwargs,
+            )
+        return await Bench.collect(
+            self.scheduler,
+            cmd,
+            index,
+            binary=self.binary,
+            exclusive=cmd in self.exclusive,
+            **kwargs,
+        )
+
+    def stop(self):
+        for worker in self.workers.values():
+            worker.stop()
 
 
 def fancy(style: str, string: str) -> str:
@@ -79,14 +233,22 @@ def fancy(style: str, string: str) -> str:
     return string
 
 
-def bench(
+async def bench(
     hexcmds: typing.Iterable[str],
     *,
+    scheduler: Scheduler,
+    exclusive: typing.Collection[str] = (),
     timeout: float = None,
     bases: typing.Iterable[int],
-    count: int,
+    settings: sampling.Settings,
     reference: typing.Optional[str],
-):
+    cache: fibcache.PairCache | None = None,
+    verify: str = "full",
+    nprimes: int = 3,
+    binary: bool = True,
+    usage: bool = False,
+    output: results.Writer | None = None,
+) -> list[results.Record]:
 
     if reference is not None:
         hexcmds = filter(lambda cmd: not os.path.samefile(reference, cmd), hexcmds)
@@ -96,64 +258,286 @@ def bench(
     headlen = max((len(refname), *map(len, hexcmds)))
     timelen = 10
 
+    if verify == "fingerprint":
+        moduli = random_primes(nprimes)
+        refname += " (mod p)" if reference is None else ""
+        headlen = max(headlen, len(refname))
+    else:
+        moduli = None
+
+    runner = Runner(
+        [*hexcmds, *([reference] if reference is not None else [])],
+        scheduler=scheduler,
+        exclusive=exclusive,
+        binary=binary,
+    )
+    measure = runner.measure
+
+    print(
+        f"{'': >{headlen}} {'median': >{timelen}} {'mad': >{timelen}}"
+        f" {'min': >{timelen}} {'runs': >4} {'speedup': >9}"
+        + (
+            f" {'rss': >9} {'cpu/wall': >8} {'vcsw': >7} {'ivcsw': >7}"
+            f" {'minflt': >8} {'majflt': >6}"
+            if usage
+            else ""
+        )
+    )
+
+    def stats(samples: sampling.Samples) -> str:
+        return (
+            f"{samples.median: {timelen}.5f} {samples.mad: {timelen}.5f}"
+            f" {samples.min: {timelen}.5f} {samples.count: >4}"
+        )
+
+    def median_usage(name: str, count: int) -> Usage | None:
+        """median usage of the timed runs of `name`"""
+        if not count or len(usages[name]) < count:
+            return None
+        return rusage.median(usages[name][-count:])
+
+    def resources(name: str, count: int) -> str:
+        u = median_usage(name, count)
+        if not usage or u is None:
+            return ""
+        return (
+            f" {u.maxrss / 1024: 8.1f}M {u.parallelism: 8.2f} {u.nvcsw: >7.0f}"
+            f" {u.nivcsw: >7.0f} {u.minflt: >8.0f} {u.majflt: >6.0f}"
+        )
+
+    # the reference then only times cache lookups: there are no speedups
+    cached = reference is None and moduli is None and cache is not None
+
+    records = []
+
+    def record(name: str, samples: sampling.Samples, **kwargs):
+        found = results.Record.of(
+            index,
+            name,
+            samples,
+            confidence=settings.confidence,
+            usage=median_usage(name, samples.count),
+            **kwargs,
+        )
+        records.append(found)
+        if output is not None:
+            output.write(found)
+
     for index in gen_indices(bases):
         print(fancy("\x1b[35m", f"# index: {index} ({index:b})"), flush=True)
 
-        ok = [False] * len(hexcmds)
-        print(fancy("\x1b[1;36m", f"{refname: >{headlen}}"), end=" ", flush=True)
-        gold = (
-            Bench.golden(index)
-            if reference is None
-            else Bench.collect(reference, index)
+        if reference is not None:
+            golden = lambda: measure(reference, index, timeout=timeout, moduli=moduli)
+        else:
+            # (the child inherits the pinning of the thread that forks it)
+            golden = lambda: scheduler.call(
+                Bench.reference, index, timeout=timeout, cache=cache, moduli=moduli
+            )
+        gold = await golden()
+
+        # the last run of each command, to tell how it failed
+        last = {}
+        # resources used by its successful runs (the timed ones last)
+        usages = {}
+
+        def job(name: str, run: typing.Callable[[], typing.Awaitable[Bench]]):
+            usages[name] = []
+
+            async def sample() -> float | None:
+                bench = last[name] = await run()
+                if failure(bench, None if name == refname else gold):
+                    return None
+                if bench.usage is not None:
+                    usages[name].append(bench.usage)
+                return bench.runtime
+
+            return sample
+
+        # fibonappy is timed once, as computing its result is the costly part;
+        # an external reference is sampled like the other commands
+        jobs = {refname: job(refname, golden)} if reference is not None else {}
+        for cmd in hexcmds:
+            jobs[cmd] = job(
+                cmd,
+                lambda cmd=cmd: measure(cmd, index, timeout=timeout, moduli=moduli),
+            )
+        if reference is None and failure(gold) is not None:
+            # (there is nothing to check the commands against)
+            jobs = {}
+        samples = await sampling.sample(jobs, settings)
+
+        print(fancy("\x1b[1;36m", f"{refname: >{headlen}}"), end=" ")
+        if reference is None:
+            last[refname] = gold
+            usages[refname] = []
+            gold_samples = sampling.Samples(
+                [gold.runtime], failed=failure(gold) is not None
+            )
+        else:
+            gold_samples = samples[refname]
+        if gold_samples.failed:
+            style, label = failure(last[refname])
+            print(fancy(style, f"{label: >{timelen}}"), flush=True)
+            record(refname, gold_samples, verdict=label)
+            break
+        record(refname, gold_samples)
+        gold_usage = resources(refname, gold_samples.count)
+        print(
+            fancy("\x1b[1;36m", stats(gold_samples)),
+            end=f" {'': >10}{gold_usage}\n" if gold_usage else "\n",
+            flush=True,
         )
-        print(fancy("\x1b[1;36m", f"{gold.runtime: {timelen}.5f}"), flush=True)
+
+        ok = [False] * len(hexcmds)
         for i in range(len(hexcmds)):
             cmd = hexcmds[i]
-            name = f"{cmd: >{headlen}}"
-            print(name, end=" ", flush=True)
-
-            bench = mean(
-                lambda: Bench.collect(cmd, index, timeout=timeout), count=count
-            )
+            print(f"{cmd: >{headlen}}", end=" ")
 
-            if math.isnan(bench.runtime):
-                print(fancy("\x1b[1;33m", f"{'ERROR': >{timelen}}"), flush=True)
+            bench = samples[cmd]
+            if bench.failed:
+                style, label = failure(last[cmd], gold)
+                print(fancy(style, f"{label: >{timelen}}"), flush=True)
+                record(cmd, bench, verdict=label)
                 continue
-            if math.isinf(bench.runtime):
-                print(fancy("\x1b[31m", f"{'TIMEOUT': >{timelen}}"), flush=True)
-                continue
-            if bench.result is None:
-                print(fancy("\x1b[1;33m", f"{'INVALID': >{timelen}}"), flush=True)
-                continue
-            if bench.result != gold.result:
+
+            ok[i] = True
+            if cached:
                 print(
-                    fancy("\x1b[1;37;41m", f"{'INCORRECT': >{timelen}}"),
-                    flush=True,
+                    stats(bench), f"{'': >10}" + resources(cmd, bench.count), flush=True
                 )
+                record(cmd, bench)
                 continue
-
-            ok[i] = True
-            if gold.runtime > bench.runtime:
-                speedup = gold.runtime / bench.runtime
+            if gold_samples.median > bench.median:
+                speedup = gold_samples.median / bench.median
             else:
-                speedup = -bench.runtime / gold.runtime
+                speedup = -bench.median / gold_samples.median
+            # only colored if the confidence intervals are apart (or if the
+            # single timing of the reference is out of that of the command)
+            if gold_samples.count == 1:
+                bounds = bench.interval(settings.confidence)
+                apart = bounds is not None and not (
+                    bounds[0] <= gold_samples.median <= bounds[1]
+                )
+            else:
+                apart = sampling.significant(
+                    bench, gold_samples, confidence=settings.confidence
+                )
             print(
-                f"{bench.runtime: 10.5f}",
+                stats(bench),
                 fancy(
                     (
                         "\x1b[32m"
-                        if speedup >= 1.5
-                        else "\x1b[31m" if speedup <= -1.5 else "\x1b[2m"
+                        if apart and speedup >= 1.5
+                        else "\x1b[31m" if apart and speedup <= -1.5 else "\x1b[2m"
                     ),
-                    f"{speedup:+8.3f}x",
-                ),
+                    f"{speedup:+8.3f}x" + ("*" if apart else " "),
+                )
+                + resources(cmd, bench.count),
                 flush=True,
             )
+            record(cmd, bench, speedup=speedup)
 
         hexcmds = [hexcmds[i] for i in range(len(hexcmds)) if ok[i]]
         if not hexcmds:
             break
 
+    runner.stop()
+    return records
+
+
+def report(changes: typing.Sequence[results.Change], threshold: float):
+    """prints the slowdowns against a baseline, regressions highlighted"""
+    headlen = max((len(change.binary) for change in changes), default=0)
+    print(fancy("\x1b[35m", f"# against the baseline (threshold: {threshold:+.1%})"))
+    print(
+        f"{'': >{headlen}} {'index': >12} {'baseline': >10} {'current': >10}"
+        f" {'slowdown': >9} {'interval': >17}"
+    )
+    for change in changes:
+        line = f"{change.binary: >{headlen}} {change.index: >12}"
+        base, current = change.baseline, change.current
+        if change.ratio is None:
+            line += f" {base.verdict: >10} {current.verdict: >10}"
+        else:
+            line += (
+                f" {base.median: 10.5f} {current.median: 10.5f}"
+                f" {change.ratio: 8.3f}x [{change.low: 7.3f}, {change.high: 7.3f}]"
+            )
+        if change.regressed:
+            print(fancy("\x1b[1;37;41m", line + " REGRESSED"), flush=True)
+        else:
+            print(line, flush=True)
+
+
+async def frontiers(
+    hexcmds: typing.Iterable[str],
+    seconds: float,
+    *,
+    scheduler: Scheduler,
+    exclusive: typing.Collection[str] = (),
+    settings: sampling.Settings,
+    tolerance: float = 0.01,
+    nprimes: int = 3,
+    binary: bool = True,
+):
+    """largest index each command computes within `seconds` (checking results
+    by fingerprint, which is cheap at any index)"""
+
+    hexcmds = sorted(hexcmds, key=lambda p: os.path.split(p)[::-1])
+    headlen = max(map(len, hexcmds), default=0)
+    moduli = random_primes(nprimes)
+    runner = Runner(hexcmds, scheduler=scheduler, exclusive=exclusive, binary=binary)
+
+    golds = {}
+
+    async def search(cmd: str) -> tuple[str, frontier.Frontier, tuple | None]:
+        failed = None
+
+        async def runtime(index: int) -> float | None:
+            nonlocal failed
+            # past twice the budget, a run only tells that it is over it
+            bench = await runner.measure(cmd, index, timeout=2 * seconds, moduli=moduli)
+            if math.isinf(bench.runtime):
+                return math.inf
+            gold = None
+            if failure(bench) is None:
+                if index not in golds:
+                    golds[index] = await scheduler.call(
+                        Bench.fingerprint, index, moduli
+                    )
+                gold = golds[index]
+            if failure(bench, gold) is not None:
+                failed = bench, gold
+                return None
+            return bench.runtime
+
+        found = await frontier.search(
+            runtime, seconds, settings=settings, tolerance=tolerance
+        )
+        return cmd, found, failed
+
+    print(
+        f"{'': >{headlen}} {'frontier': >12} {'over': >12} {'bracket': >7}"
+        f" {'runs': >5}  model"
+    )
+    for done in asyncio.as_completed(map(search, hexcmds)):
+        cmd, found, failed = await done
+        print(f"{cmd: >{headlen}} {found.lo: >12}", end=" ")
+        if found.failed:
+            style, label = failure(*failed)
+            print(fancy(style, f"{label: >12}"), f"{'': >7} {found.runs: >5}")
+            continue
+        over = "" if found.hi is None else found.hi
+        spread = (
+            ""
+            if found.hi is None
+            else f"{(found.hi - found.lo) / max(1, found.lo):.2%}"
+        )
+        model = "" if found.fit is None else f"{found.fit.coeff:.3g} {found.fit.model}"
+        print(f"{over: >12} {spread: >7} {found.runs: >5}  {model}", flush=True)
+
+    runner.stop()
+
 
 if __name__ == "__main__":
     import argparse
@@ -162,11 +546,155 @@ if __name__ == "__main__":
         description="Really bad benchmark script.",
     )
 
-    parser.add_argument("cmds", metavar="HEXECUTABLE", nargs="*")
+    parser.add_argument(
+        "cmds",
+        metavar="HEXECUTABLE",
+        nargs="*",
+        help="*.hex.out executables, or shared objects (lib/*.so) to call in-process.",
+    )
     parser.add_argument("-t", "--timeout", type=float, default=10.0)
     parser.add_argument("-b", "--base", type=int, action="append")
-    parser.add_argument("-m", "--mean-of", type=int, default=3)
+    parser.add_argument(
+        "-m",
+        "--min-runs",
+        "--mean-of",
+        type=int,
+        default=sampling.Settings.min_runs,
+        help="Minimum number of timed runs per index (past the warmup).",
+    )
+    parser.add_argument(
+        "--max-runs",
+        type=int,
+        default=sampling.Settings.max_runs,
+        help="Maximum number of timed runs per index.",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=sampling.Settings.warmup,
+        help="Number of untimed runs per index.",
+    )
+    parser.add_argument(
+        "--ci-width",
+        metavar="FRACTION",
+        type=float,
+        default=sampling.Settings.width,
+        help="Sample until the confidence interval of the median is this narrow,"
+        " relative to the median.",
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=sampling.Settings.confidence,
+        help="Confidence level of the intervals.",
+    )
+    parser.add_argument(
+        "--budget",
+        metavar="SECONDS",
+        type=float,
+        default=sampling.Settings.budget,
+        help="Stop sampling an executable once its runs at an index took this long.",
+    )
     parser.add_argument("-G", "--baseline", metavar="HEXECUTABLE")
+    parser.add_argument(
+        "-C",
+        "--cache",
+        metavar="FOLDER",
+        nargs="?",
+        const=fibcache.DEFAULT_FOLDER,
+        help="Reuse golden results cached on disk (which leaves no speedups to"
+        " show, as the reference then times cache lookups).",
+    )
+    parser.add_argument(
+        "--cache-size",
+        metavar="BYTES",
+        type=int,
+        default=fibcache.DEFAULT_MAX_BYTES,
+        help="Size budget of the golden cache.",
+    )
+    parser.add_argument(
+        "--verify",
+        choices=["full", "fingerprint"],
+        default="full",
+        help="Compare full results, or only their residues modulo random 61-bit"
+        " primes.",
+    )
+    parser.add_argument(
+        "--fingerprint-primes",
+        metavar="COUNT",
+        type=int,
+        default=3,
+        help="Number of primes used with --verify=fingerprint.",
+    )
+
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        metavar="N",
+        type=int,
+        help="Run on at most N physical cores at once (all of them by default).",
+    )
+    parser.add_argument(
+        "--exclusive",
+        metavar="HEXECUTABLE",
+        action="append",
+        default=[],
+        help="Give the whole machine to this executable's runs (automatic for"
+        " executables that create threads).",
+    )
+    parser.add_argument(
+        "-r",
+        "--rusage",
+        action="store_true",
+        help="Also show the median peak RSS, CPU time per wall-clock time (the"
+        " effective parallelism), context switches and page faults of the runs.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        metavar="FILE",
+        help="Also write a record of each executable at each index (runtimes,"
+        " verdict, build flags, resources) to FILE.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["jsonl", "csv"],
+        help="Format of --output (by default, CSV if FILE ends in .csv, JSON lines"
+        " otherwise).",
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="BASELINE",
+        help="Compare the runs with those of the same executables and indices in"
+        " BASELINE (an --output file), and fail if any regressed.",
+    )
+    parser.add_argument(
+        "--threshold",
+        metavar="FRACTION",
+        type=float,
+        default=0.05,
+        help="Slowdown past which a run regressed, even at the end of its"
+        " confidence interval most favourable to it.",
+    )
+    parser.add_argument(
+        "--frontier",
+        metavar="SECONDS",
+        type=float,
+        help="Instead of sweeping indices, search for the largest index each"
+        " executable computes within SECONDS (verified by fingerprint).",
+    )
+    parser.add_argument(
+        "--tolerance",
+        metavar="FRACTION",
+        type=float,
+        default=0.01,
+        help="Relative precision of the --frontier search.",
+    )
+    parser.add_argument(
+        "--text",
+        action="store_true",
+        help="Read results as hex text, for executables without the raw format (-b).",
+    )
 
     args = parser.parse_args()
 
@@ -177,13 +705,89 @@ if __name__ == "__main__":
 
         hexcmds = glob.glob("./bin/*.hex.out")
 
+    if args.frontier is not None and (args.output or args.compare):
+        parser.error("--output and --compare do not apply to --frontier")
+    baseline = results.load(args.compare) if args.compare is not None else None
+    output = writer = None
+    if args.output is not None:
+        output = open(args.output, "w", newline="")
+        csv = (
+            args.output.endswith(".csv")
+            if args.format is None
+            else args.format == "csv"
+        )
+        writer = results.Writer(output, "csv" if csv else "jsonl")
+
+    cores = physical_cores()
+    scheduler = Scheduler(cores[: args.jobs] if args.jobs else cores)
+    settings = sampling.Settings(
+        warmup=args.warmup,
+        min_runs=args.min_runs,
+        max_runs=args.max_runs,
+        width=args.ci_width,
+        confidence=args.confidence,
+        budget=args.budget,
+    )
     try:
-        bench(
-            hexcmds,
-            timeout=args.timeout,
-            bases=args.base or [3],
-            count=args.mean_of,
-            reference=args.baseline,
+        if args.frontier is not None:
+            asyncio.run(
+                frontiers(
+                    hexcmds,
+                    args.frontier,
+                    scheduler=scheduler,
+                    exclusive=args.exclusive,
+                    settings=settings,
+                    tolerance=args.tolerance,
+                    nprimes=args.fingerprint_primes,
+                    binary=not args.text,
+                )
+            )
+            exit(0)
+        records = asyncio.run(
+            bench(
+                hexcmds,
+                scheduler=scheduler,
+                exclusive=args.exclusive,
+                timeout=args.timeout,
+                bases=args.base or [3],
+                settings=settings,
+                reference=args.baseline,
+                cache=(
+                    fibcache.PairCache(args.cache, max_bytes=args.cache_size)
+                    if args.cache is not None
+                    else None
+                ),
+                verify=args.verify,
+                nprimes=args.fingerprint_primes,
+                binary=not args.text,
+                usage=args.rusage,
+                output=writer,
+            )
         )
     except KeyboardInterrupt:
         print("\n", fancy("\x1b[33m", "ABORTED"))
+        exit(130)
+    finally:
+        if output is not None:
+            output.close()
+
+    if baseline is not None:
+        changes = results.compare(
+            baseline,
+            records,
+            threshold=args.threshold,
+            resolution=settings.resolution,
+        )
+        report(changes, args.threshold)
+        for record in results.missing(baseline, records):
+            print(
+                fancy("\x1b[33m", f"{record.binary} ({record.index}): not run"),
+                file=sys.stderr,
+            )
+        # (the reference always matches, but is not what is being gated)
+        compared = {results.key(change.current)[0] for change in changes}
+        if not compared.intersection(map(os.path.relpath, hexcmds)):
+            print(f"No command matches the runs of {args.compare}.", file=sys.stderr)
+            exit(1)
+        if any(change.regressed for change in changes):
+            exit(1)
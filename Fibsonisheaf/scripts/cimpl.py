@@ -0,0 +1,123 @@
+import ctypes
+import multiprocessing
+import os
+import resource
+import time
+
+import rusage
+from fibonappy.cntt import Number, view
+
+# In-process harness for the C implementations, built as shared objects
+# (`make lib/$(algo).so`). `fibonacci` is called through ctypes and timed
+# around the call alone, so that neither process startup nor hex I/O is
+# measured.
+#
+# `Worker` runs a library in a forked child instead, so that crashes (and
+# timeouts, which cannot interrupt a foreign call) only take the child down.
+# The child also reports the resources each call used (see `rusage`).
+
+
+class Library:
+
+    def __init__(self, path: str):
+        self.path = path
+        self.dll = ctypes.CDLL(os.path.abspath(path))
+        self.dll.fibonacci.argtypes = [ctypes.c_uint64]
+        self.dll.fibonacci.restype = Number
+        self.dll.fibonacci_free.argtypes = [ctypes.c_void_p]
+        self.dll.fibonacci_free.restype = None
+
+    def call(self, index: int) -> tuple[Number, int]:
+        """raw result of `fibonacci(index)` (to be freed), and its runtime in ns"""
+        start = time.perf_counter_ns()
+        number = self.dll.fibonacci(index)
+        end = time.perf_counter_ns()
+        return number, end - start
+
+    def free(self, number: Number):
+        self.dll.fibonacci_free(number.bytes)
+
+    def fibonacci(self, index: int) -> tuple[int, int]:
+        """returns F(index), and the runtime of the call in ns"""
+        number, runtime = self.call(index)
+        try:
+            return int.from_bytes(view(number), "little"), runtime
+        finally:
+            self.free(number)
+
+
+def _serve(path: str, conn):
+    library = Library(path)
+    while True:
+        try:
+            index = conn.recv()
+        except EOFError:
+            return
+        rusage.reset_peak()
+        before = resource.getrusage(resource.RUSAGE_SELF)
+        number, runtime = library.call(index)
+        after = resource.getrusage(resource.RUSAGE_SELF)
+        usage = rusage.Usage.between(before, after, runtime / 1e9, maxrss=rusage.peak())
+        try:
+            conn.send((runtime, usage))
+            conn.send_bytes(view(number))
+        finally:
+            library.free(number)
+
+
+class Worker:
+    """a `Library` loaded in a forked child process"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.proc = None
+        # resources used by the last call
+        self.usage: rusage.Usage | None = None
+        self.start()
+
+    def start(self):
+        ctx = multiprocessing.get_context("fork")
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_serve, args=(self.path, child), daemon=True)
+        self.proc.start()
+        child.close()
+
+    def stop(self):
+        self.conn.close()
+        self.proc.kill()
+        self.proc.join()
+
+    def __enter__(self) -> "Worker":
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def fibonacci(self, index: int, *, timeout: float | None = None) -> tuple[int, int]:
+        """returns F(index), and the runtime of the call in ns (the resources it
+        used are left in `usage`)
+
+        Raises TimeoutError or ChildProcessError (after restarting the worker)
+        if the call does not return in time, or crashes."""
+        self.usage = None
+        self.conn.send(index)
+        try:
+            if not self.conn.poll(timeout):
+                raise TimeoutError(f"F({index}) timed out")
+            runtime, self.usage = self.conn.recv()
+            data = self.conn.recv_bytes()
+        except EOFError:
+            self.proc.join()
+            exitcode = self.proc.exitcode
+            self.restart()
+            raise ChildProcessError(
+                f"F({index}) crashed the worker (exit code {exitcode})"
+            )
+        except TimeoutError:
+            self.restart()
+            raise
+        return int.from_bytes(data, "little"), runtime
+
+    def restart(self):
+        self.stop()
+        self.start()
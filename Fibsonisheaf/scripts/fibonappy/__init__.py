@@ -3,7 +3,13 @@ import typing
 # field_ext implementation in Python
 
 
-def main(fname: typing.Optional[str], n: int, fibonacci: typing.Callable[[int], int]):
+def main(
+    fname: typing.Optional[str],
+    n: int,
+    fibonacci: typing.Callable[[int], int],
+    *,
+    binary: bool = False,
+):
     import sys
     import time
 
@@ -11,15 +17,25 @@ def main(fname: typing.Optional[str], n: int, fibonacci: typing.Callable[[int],
     fib = fibonacci(n)
     end_time = time.time()
 
+    print(f"# Runtime: {end_time-start_time:.9f}s", file=sys.stderr)
+    print(f"# Size:    {max(1, (fib.bit_length()+7)>>3)} B", file=sys.stderr)
+
+    if binary:
+        from . import raw
+
+        if fname is None:
+            raw.write(sys.stdout.buffer, n, fib)
+        else:
+            with open(fname, "wb") as fp:
+                raw.write(fp, n, fib)
+        return
+
     if fname is None:
         fp = sys.stdout
     else:
         fp = open(fname, "w")
 
-    fibhex = f"{fib:x}"
-    print(f"# Runtime: {end_time-start_time:.9f}s", file=sys.stderr)
-    print(f"# Size:    {(len(fibhex)+1)>>1} B", file=sys.stderr)
-    fp.write(fibhex)
+    fp.write(f"{fib:x}")
 
     if fname is None:
         fp.write("\n")
@@ -40,5 +56,11 @@ def argparser():
         nargs="?",
         help="output file to store result (or stdout if not provided)",
     )
+    parser.add_argument(
+        "-b",
+        "--binary",
+        action="store_true",
+        help="write the raw format of `hex.c -b` instead of hex",
+    )
 
     return parser
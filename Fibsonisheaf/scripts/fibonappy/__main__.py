@@ -1,6 +1,6 @@
 if __name__ == "__main__":
     from . import argparser, main
-    from .fast_double import fibonacci
+    from .lucas import fibonacci
 
     args = argparser().parse_args()
-    main(args.fname, args.n, fibonacci)
+    main(args.fname, args.n, fibonacci, binary=args.binary)
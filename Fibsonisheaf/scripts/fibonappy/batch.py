@@ -0,0 +1,67 @@
+import typing
+
+from .lucas import lucas_double, lucas_increment, lucas_scan
+
+
+def fibonacci_many(indices: typing.Iterable[int]) -> list[int]:
+    """F(n) for every n in `indices`, sharing the doublings of common binary prefixes"""
+    indices = list(indices)
+    wanted = set(indices)
+    prefixes = {n >> j for n in wanted for j in range(n.bit_length())}
+    results = {0: 0}
+
+    # depth-first walk down the binary trie of the indices, from F(1), L(1)
+    stack = [(1, 1, 1)] if 1 in prefixes else []
+    while stack:
+        k, f, l = stack.pop()
+        if k in wanted:
+            results[k] = f
+        if 2 * k in prefixes or 2 * k + 1 in prefixes:
+            f2, l2 = lucas_double(k, f, l)
+            if 2 * k + 1 in prefixes:
+                stack.append((2 * k + 1, *lucas_increment(f2, l2)))
+            if 2 * k in prefixes:
+                stack.append((2 * k, f2, l2))
+
+    return [results[n] for n in indices]
+
+
+def fibonacci_range(start: int, stop: int) -> typing.Iterator[int]:
+    """F(start), ..., F(stop - 1)"""
+    if start >= stop:
+        return
+    f, l = lucas_scan(start, 0, 0, 2)
+    a, b = f, (f + l) >> 1
+    for _ in range(start, stop):
+        yield a
+        a, b = b, a + b
+
+
+def main(fname: typing.Optional[str], start: int, stop: int):
+    import sys
+
+    fp = sys.stdout if fname is None else open(fname, "w")
+    for index, fib in enumerate(fibonacci_range(start, stop), start):
+        fp.write(f"{index} {fib:x}\n")
+    if fname is not None:
+        fp.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Hex table of consecutive Fibonacci numbers."
+    )
+    parser.add_argument("start", metavar="START", type=int, help="first index")
+    parser.add_argument("stop", metavar="STOP", type=int, help="last index (excluded)")
+    parser.add_argument(
+        "fname",
+        metavar="FILE",
+        type=str,
+        nargs="?",
+        help="output file to store the table (or stdout if not provided)",
+    )
+
+    args = parser.parse_args()
+    main(args.fname, args.start, args.stop)
@@ -0,0 +1,138 @@
+import os
+import struct
+
+from .lucas import lucas_scan
+from .multiply import mul
+
+# On-disk cache of Fibonacci pairs (F(k), F(k+1)).
+#
+# Each pair is stored in its own file, named after k (in hex), as
+#   <u64: byte length of F(k)> <F(k), little-endian> <F(k+1), little-endian>
+# Files are touched on every hit, and the least recently used ones are evicted
+# once the folder grows beyond its size budget.
+
+DEFAULT_FOLDER = os.path.join(os.path.expanduser("~"), ".cache", "fibonappy")
+DEFAULT_MAX_BYTES = 1 << 30
+
+# jump with the addition formula only if the gap is this much smaller than the
+# cached index (the products are then very unbalanced, and thus cheap)
+ADDITION_SHIFT = 4
+
+_HEADER = struct.Struct("<Q")
+_SUFFIX = ".pair"
+
+
+def _nbytes(x: int) -> int:
+    return (x.bit_length() + 7) >> 3
+
+
+class PairCache:
+
+    def __init__(self, folder: str = DEFAULT_FOLDER, *, max_bytes=DEFAULT_MAX_BYTES):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        os.makedirs(folder, exist_ok=True)
+
+    def path(self, k: int) -> str:
+        return os.path.join(self.folder, f"{k:x}{_SUFFIX}")
+
+    def keys(self) -> list[int]:
+        return [
+            int(fname[: -len(_SUFFIX)], base=16)
+            for fname in os.listdir(self.folder)
+            if fname.endswith(_SUFFIX)
+        ]
+
+    def get(self, k: int) -> tuple[int, int] | None:
+        """returns F(k), F(k+1) if cached"""
+        try:
+            with open(self.path(k), "rb") as file:
+                data = memoryview(file.read())
+        except FileNotFoundError:
+            return None
+        os.utime(self.path(k))
+
+        (length,) = _HEADER.unpack_from(data)
+        fk = int.from_bytes(data[_HEADER.size : _HEADER.size + length], "little")
+        fk1 = int.from_bytes(data[_HEADER.size + length :], "little")
+        return fk, fk1
+
+    def put(self, k: int, pair: tuple[int, int]):
+        fk, fk1 = pair
+        if _HEADER.size + _nbytes(fk) + _nbytes(fk1) > self.max_bytes:
+            return
+
+        path = self.path(k)
+        tmp = os.path.join(self.folder, f".{k:x}{_SUFFIX}.tmp")
+        with open(tmp, "wb") as file:
+            file.write(_HEADER.pack(_nbytes(fk)))
+            file.write(fk.to_bytes(_nbytes(fk), "little"))
+            file.write(fk1.to_bytes(_nbytes(fk1), "little"))
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for k in self.keys():
+            try:
+                entries.append((os.stat(self.path(k)), self.path(k)))
+            except FileNotFoundError:  # evicted concurrently
+                continue
+
+        total = sum(st.st_size for st, _ in entries)
+        for st, path in sorted(entries, key=lambda entry: entry[0].st_mtime_ns):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= st.st_size
+
+
+def _jump(n: int, cache: PairCache) -> tuple[int, int]:
+    keys = cache.keys()
+
+    # F(m+d) = F(m) * F(d+1) + F(m-1) * F(d)
+    m = max((m for m in keys if 0 < m <= n), default=0)
+    d = n - m
+    if m and d <= m >> ADDITION_SHIFT:
+        pair = cache.get(m)
+        if pair is not None:
+            fm, fm1 = pair
+            fd, ld = lucas_scan(d, 0, 0, 2)
+            fd1 = (fd + ld) >> 1
+            return (
+                mul(fm, fd1) + mul(fm1 - fm, fd),
+                mul(fm1, fd1) + mul(fm, fd),
+            )
+
+    # otherwise, continue the bit-scan from the longest cached prefix of n
+    bitlen = n.bit_length()
+    for k in sorted(keys, key=int.bit_length, reverse=True):
+        if 0 < k <= n and n >> (bitlen - k.bit_length()) == k:
+            pair = cache.get(k)
+            if pair is not None:
+                fk, fk1 = pair
+                f, l = lucas_scan(n, k, fk, (fk1 << 1) - fk)
+                return f, (f + l) >> 1
+
+    f, l = lucas_scan(n, 0, 0, 2)
+    return f, (f + l) >> 1
+
+
+def fib_pair(n: int, cache: PairCache) -> tuple[int, int]:
+    """returns F(n), F(n+1), storing them in the cache"""
+    pair = cache.get(n)
+    if pair is None:
+        pair = _jump(n, cache)
+        cache.put(n, pair)
+    return pair
+
+
+def fibonacci(n: int, cache: PairCache | None = None) -> int:
+    return fib_pair(n, cache or PairCache())[0]
+
+
+if __name__ == "__main__":
+    from . import argparser, main
+
+    args = argparser().parse_args()
+    main(args.fname, args.n, fibonacci, binary=args.binary)
@@ -0,0 +1,75 @@
+import ctypes
+import os
+
+# Multiplication of big ints by the C NTT of `impl/ntt.c` or `impl/nttt.c`,
+# through the `ntt_mul` and `ntt_sqr` entry points of their shared objects
+# (`make lib/ntt.so lib/nttt.so`).
+#
+# Operands are handed over as little-endian bytes, and the product comes back
+# in a buffer of the library, which is converted then freed. Products the
+# library cannot compute exactly (too long for its roots of unity, or for the
+# convolution to stay below its prime) come back NULL, as do products it ran
+# out of memory for, and are left to CPython.
+
+DEFAULT_LIBRARY = os.path.join(
+    os.path.dirname(__file__), os.pardir, os.pardir, "lib", "nttt.so"
+)
+
+
+class Number(ctypes.Structure):
+    """`struct number` of fib_base.h"""
+
+    _fields_ = [("bytes", ctypes.c_void_p), ("length", ctypes.c_size_t)]
+
+
+def view(number: Number) -> memoryview:
+    """the bytes of `number`, without copying them"""
+    return memoryview((ctypes.c_uint8 * number.length).from_address(number.bytes))
+
+
+def _nbytes(x: int) -> int:
+    return (x.bit_length() + 7) >> 3
+
+
+class Multiplier:
+
+    def __init__(self, path: str = DEFAULT_LIBRARY):
+        self.path = path
+        self.version = f"{os.path.abspath(path)}@{os.stat(path).st_mtime_ns}"
+        self.dll = ctypes.CDLL(os.path.abspath(path))
+        self.dll.ntt_mul.argtypes = [
+            ctypes.c_char_p,
+            ctypes.c_size_t,
+            ctypes.c_char_p,
+            ctypes.c_size_t,
+        ]
+        self.dll.ntt_mul.restype = Number
+        self.dll.ntt_sqr.argtypes = [ctypes.c_char_p, ctypes.c_size_t]
+        self.dll.ntt_sqr.restype = Number
+        self.dll.fibonacci_free.argtypes = [ctypes.c_void_p]
+        self.dll.fibonacci_free.restype = None
+
+    def _to_int(self, number: Number) -> int | None:
+        if not number.bytes:
+            return None
+        try:
+            return int.from_bytes(view(number), "little")
+        finally:
+            self.dll.fibonacci_free(number.bytes)
+
+    def mul(self, a: int, b: int) -> int:
+        if (a < 0) != (b < 0):
+            return -self.mul(abs(a), abs(b))
+        a, b = abs(a), abs(b)
+        na, nb = _nbytes(a), _nbytes(b)
+        number = self.dll.ntt_mul(
+            a.to_bytes(na, "little"), na, b.to_bytes(nb, "little"), nb
+        )
+        product = self._to_int(number)
+        return a * b if product is None else product
+
+    def sqr(self, a: int) -> int:
+        a = abs(a)
+        na = _nbytes(a)
+        product = self._to_int(self.dll.ntt_sqr(a.to_bytes(na, "little"), na))
+        return a * a if product is None else product
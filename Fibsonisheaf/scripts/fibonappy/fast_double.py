@@ -1,3 +1,6 @@
+from .multiply import mul, sqr
+
+
 # based on F(2n) = F(n) * (2*F(n+1) - F(n))
 #          F(2n+1) = F(n+1)**2 + F(n)**2
 def fibonacci(n: int) -> int:
@@ -6,8 +9,8 @@ def fibonacci(n: int) -> int:
         if k <= 1:
             return (k, 1)
         fh, fh1 = fib_pair(k >> 1)
-        fk = fh * ((fh1 << 1) - fh)
-        fk1 = fh1**2 + fh**2
+        fk = mul(fh, (fh1 << 1) - fh)
+        fk1 = sqr(fh1) + sqr(fh)
         if k & 1:
             fk, fk1 = fk1, fk + fk1
         return fk, fk1
@@ -19,4 +22,4 @@ if __name__ == "__main__":
     from . import argparser, main
 
     args = argparser().parse_args()
-    main(args.fname, args.n, fibonacci)
+    main(args.fname, args.n, fibonacci, binary=args.binary)
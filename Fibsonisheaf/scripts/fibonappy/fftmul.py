@@ -0,0 +1,215 @@
+import functools
+import math
+import os
+
+import numpy as np
+
+# Multiplication of big ints by a floating-point FFT (NumPy's `rfft`).
+#
+# Operands are split into limbs, convolved in double precision, and rounded
+# back to integers. Each coefficient of the convolution is correct as long as
+# the rounding error of the FFT stays below 1/2, which is guaranteed by the
+# bound of Percival ("Rapid multiplication modulo the sum and difference of
+# highly composite numbers", 2003) for a transform of N = 2^n points on limbs
+# of at most B:
+#   N B^2 ((1 + eps)^(3n) (1 + eps sqrt(5))^(3n + 1) (1 + beta)^(3n) - 1)
+# with eps = 2^-53 and beta (the error of the twiddle factors) taken as eps.
+# The limbs are thus as wide as this bound allows, from 16 bits (for small
+# products) down to 8.
+#
+# With `check`, the product is also verified modulo a Mersenne prime (in
+# linear time) and ArithmeticError is raised on a mismatch.
+
+LIMB_CHOICES = (16, 14, 12, 10, 8)
+
+EPS = 2.0**-53
+BETA = EPS
+
+FINGERPRINT = (1 << 61) - 1
+CHECK = bool(os.environ.get("FIBONAPPY_FFT_CHECK"))
+
+
+@functools.cache
+def error_bound(limb_bits: int, log: int) -> float:
+    """bound on the rounding error of a product of 2^`log` limbs of `limb_bits` bits"""
+    limb = (1 << limb_bits) - 1
+    growth = (
+        3 * log * math.log1p(EPS)
+        + (3 * log + 1) * math.log1p(EPS * math.sqrt(5))
+        + 3 * log * math.log1p(BETA)
+    )
+    return (1 << log) * limb * limb * math.expm1(growth)
+
+
+def _max_log(limb_bits: int) -> int:
+    log = 0
+    while error_bound(limb_bits, log + 1) < 0.5:
+        log += 1
+    return log
+
+
+MAX_LOG = {bits: _max_log(bits) for bits in LIMB_CHOICES}
+
+# largest balanced operands (in bits) of an FFT product
+MAX_BITS = max(bits << (MAX_LOG[bits] - 1) for bits in LIMB_CHOICES)
+
+
+def plan(nbits: int, *, scale: float = 1) -> tuple[int, int] | None:
+    """limb width and transform length (log) for a product of `nbits` bits
+
+    None if no limb width keeps the error bound (times `scale`, for sums of
+    products or larger limbs) below 1/2."""
+    for bits in LIMB_CHOICES:
+        log = (-(-nbits // bits) - 1).bit_length()
+        if log <= MAX_LOG[bits] and scale * error_bound(bits, log) < 0.5:
+            return bits, log
+    return None
+
+
+def _group(limb_bits: int) -> tuple[int, int]:
+    """bytes and limbs of the smallest whole number of each"""
+    nbytes = math.lcm(limb_bits, 8) // 8
+    return nbytes, nbytes * 8 // limb_bits
+
+
+def spread(x: int, limb_bits: int, length: int) -> np.ndarray:
+    """the first `length` limbs of `x`, as floats"""
+    nbytes, nlimbs = _group(limb_bits)
+    ngroups = -(-length // nlimbs)
+    raw = np.frombuffer(x.to_bytes(ngroups * nbytes, "little"), np.uint8)
+    if nbytes == 1:
+        return raw[:length].astype(np.float64)
+    groups = raw.reshape(ngroups, nbytes).astype(np.uint64)
+    value = groups[:, 0].copy()
+    for j in range(1, nbytes):
+        value |= groups[:, j] << np.uint64(8 * j)
+    mask = np.uint64((1 << limb_bits) - 1)
+    limbs = np.empty((ngroups, nlimbs), dtype=np.float64)
+    for t in range(nlimbs):
+        limbs[:, t] = (value >> np.uint64(limb_bits * t)) & mask
+    return limbs.reshape(-1)[:length]
+
+
+def _pack(limbs: np.ndarray, limb_bits: int) -> int:
+    """`sum(limbs[i] << (limb_bits * i))`, for `limbs[i]` of `limb_bits` bits"""
+    nbytes, nlimbs = _group(limb_bits)
+    if nbytes == 1:
+        return int.from_bytes(limbs.astype(np.uint8).tobytes(), "little")
+    limbs = np.concatenate((limbs, np.zeros(-len(limbs) % nlimbs, np.uint64)))
+    limbs = limbs.reshape(-1, nlimbs)
+    value = limbs[:, 0].copy()
+    for t in range(1, nlimbs):
+        value |= limbs[:, t] << np.uint64(limb_bits * t)
+    raw = np.empty((len(value), nbytes), dtype=np.uint8)
+    for j in range(nbytes):
+        raw[:, j] = value >> np.uint64(8 * j)
+    return int.from_bytes(raw.tobytes(), "little")
+
+
+def fold(c: np.ndarray, limb_bits: int) -> int:
+    """`sum(round(c[i]) << (limb_bits * i))`, for `c[i]` wider than a limb"""
+    c = np.rint(c)
+    if c.min(initial=0) < 0:
+        return fold(np.maximum(c, 0), limb_bits) - fold(np.maximum(-c, 0), limb_bits)
+    c = c.astype(np.uint64)
+    mask = np.uint64((1 << limb_bits) - 1)
+    total = 0
+    for shift in range(0, 64, limb_bits):
+        part = (c >> np.uint64(shift)) & mask
+        if part.any():
+            total += _pack(part, limb_bits) << shift
+    return total
+
+
+def _check(product: int, *factors: int):
+    expected = 1
+    for x in factors:
+        expected = expected * (x % FINGERPRINT) % FINGERPRINT
+    if product % FINGERPRINT != expected:
+        raise ArithmeticError("FFT product failed its fingerprint check")
+
+
+def mul(a: int, b: int, *, check: bool = CHECK) -> int:
+    if (a < 0) != (b < 0):
+        return -mul(abs(a), abs(b), check=check)
+    a, b = abs(a), abs(b)
+
+    found = plan(a.bit_length() + b.bit_length())
+    if found is None:
+        return a * b
+    bits, log = found
+    fa = np.fft.rfft(spread(a, bits, 1 << log))
+    fa *= np.fft.rfft(spread(b, bits, 1 << log))
+    product = fold(np.fft.irfft(fa, 1 << log), bits)
+    if check:
+        _check(product, a, b)
+    return product
+
+
+def sqr(a: int, *, check: bool = CHECK) -> int:
+    a = abs(a)
+
+    found = plan(2 * a.bit_length())
+    if found is None:
+        return a * a
+    bits, log = found
+    fa = np.fft.rfft(spread(a, bits, 1 << log))
+    fa *= fa
+    product = fold(np.fft.irfft(fa, 1 << log), bits)
+    if check:
+        _check(product, a, a)
+    return product
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from .fast_double import fibonacci
+
+    parser = argparse.ArgumentParser(
+        description="Times FFT products against int.__mul__ on those of fib_pair."
+    )
+    parser.add_argument(
+        "indices",
+        metavar="INDEX",
+        type=int,
+        nargs="+",
+        help="k of the pair (F(k), F(k+1)) to multiply",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="best of this many runs")
+
+    args = parser.parse_args()
+
+    def best(f, *xs) -> tuple[int, float]:
+        runtimes = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = f(*xs)
+            runtimes.append(time.perf_counter() - start)
+        return result, min(runtimes)
+
+    print(
+        f"{'index':<9} {'bits':>8} {'limb':>5} {'log':>4}  {'bound':>7}"
+        f"  {'product':>18} {'fft':>9} {'int':>9} {'speedup':>8}"
+    )
+    for k in args.indices:
+        fh, fh1 = fibonacci(k), fibonacci(k + 1)
+        products = {
+            "F(k)(2F(k+1)-F(k))": (mul, int.__mul__, fh, (fh1 << 1) - fh),
+            "F(k+1)^2": (sqr, lambda x: x * x, fh1),
+            "F(k)^2": (sqr, lambda x: x * x, fh),
+        }
+        for name, (fft, ref, *xs) in products.items():
+            nbits = xs[0].bit_length() + xs[-1].bit_length()
+            found = plan(nbits)
+            got, fft_time = best(fft, *xs)
+            want, int_time = best(ref, *xs)
+            assert got == want, f"{name} differs at index {k}"
+            limb, log = found or (0, 0)
+            bound = error_bound(limb, log) if found else float("nan")
+            print(
+                f"{k:<9} {fh.bit_length():>8} {limb:>5} {log:>4}  {bound:.1e}"
+                f"  {name:>18} {fft_time:9.2e} {int_time:9.2e}"
+                f" {int_time / fft_time:7.2f}x"
+            )
@@ -1,3 +1,6 @@
+from .multiply import mul, sqr
+
+
 def fibonacci(n: int) -> int:
     if n <= 1:
         return n
@@ -10,12 +13,12 @@ def fibonacci(n: int) -> int:
     while n:
         if n & 1:
             a, b = (
-                (a * sa + 5 * b * sb) >> 1,
-                (a * sb + b * sa) >> 1,
+                (mul(a, sa) + 5 * mul(b, sb)) >> 1,
+                (mul(a, sb) + mul(b, sa)) >> 1,
             )
         sa, sb = (
-            (sa**2 + 5 * sb**2) >> 1,
-            sa * sb,
+            (sqr(sa) + 5 * sqr(sb)) >> 1,
+            mul(sa, sb),
         )
         n >>= 1
     return b
@@ -25,4 +28,4 @@ if __name__ == "__main__":
     from . import argparser, main
 
     args = argparser().parse_args()
-    main(args.fname, args.n, fibonacci)
+    main(args.fname, args.n, fibonacci, binary=args.binary)
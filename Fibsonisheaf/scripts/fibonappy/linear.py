@@ -10,4 +10,4 @@ if __name__ == "__main__":
     from . import argparser, main
 
     args = argparser().parse_args()
-    main(args.fname, args.n, fibonacci)
+    main(args.fname, args.n, fibonacci, binary=args.binary)
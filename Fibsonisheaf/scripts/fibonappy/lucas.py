@@ -0,0 +1,46 @@
+from .multiply import sqr
+
+
+# Carries (F(k), L(k)) while scanning the bits of n from the top, based on
+#   L(k)**2 = 5*F(k)**2 + 4*(-1)**k
+# so that, with F(k) + L(k) = 2*F(k+1), doubling only needs two squarings:
+#   F(2k) = F(k) * L(k) = ((F(k) + L(k))**2 - 6*F(k)**2 - 4*(-1)**k) / 2
+#   L(2k) = L(k)**2 - 2*(-1)**k = 5*F(k)**2 + 2*(-1)**k
+# and incrementing is linear:
+#   F(k+1) = (F(k) + L(k)) / 2
+#   L(k+1) = (5*F(k) + L(k)) / 2
+def lucas_double(k: int, f: int, l: int) -> tuple[int, int]:
+    """given F(k), L(k), returns F(2k), L(2k)"""
+    sign = -1 if k & 1 else 1  # (-1)**k
+    s = sqr(f)
+    t = sqr(f + l)
+    return (t - 6 * s - 4 * sign) >> 1, 5 * s + 2 * sign
+
+
+def lucas_increment(f: int, l: int) -> tuple[int, int]:
+    """given F(k), L(k), returns F(k+1), L(k+1)"""
+    return (f + l) >> 1, (5 * f + l) >> 1
+
+
+def lucas_scan(n: int, k: int, f: int, l: int) -> tuple[int, int]:
+    """given F(k), L(k) for a binary prefix k of n, returns F(n), L(n)"""
+    for bit in f"{n:b}"[k.bit_length() :]:
+        f, l = lucas_double(k, f, l)
+        k <<= 1
+        if bit == "1":
+            f, l = lucas_increment(f, l)
+            k += 1
+    return f, l
+
+
+def fibonacci(n: int) -> int:
+    if n <= 1:
+        return n
+    return lucas_scan(n, 1, 1, 1)[0]  # start from F(1), L(1)
+
+
+if __name__ == "__main__":
+    from . import argparser, main
+
+    args = argparser().parse_args()
+    main(args.fname, args.n, fibonacci, binary=args.binary)
@@ -0,0 +1,97 @@
+import math
+import random
+import typing
+
+from .num_theory import extract_prime_factors, miller, split
+
+# F(n) mod m, for fingerprinting results without recomputing them in full.
+
+
+def pisano_multiple(m: int, factors=None) -> int:
+    """returns a multiple of the Pisano period of m
+
+    For primes p, the period divides 3 (p == 2), 20 (p == 5), p - 1
+    (p == +-1 mod 5) or 2 * (p + 1) (p == +-2 mod 5), and the period of
+    p**e divides p**(e-1) times that of p.
+    """
+    if factors is None:
+        factors = extract_prime_factors(m)
+
+    period = 1
+    for pf in factors:
+        p = pf.factor
+        if p == 2:
+            base = 3
+        elif p == 5:
+            base = 20
+        elif p % 5 in (1, 4):
+            base = p - 1
+        else:
+            base = 2 * (p + 1)
+        period = math.lcm(period, base * p ** (pf.multiplicity - 1))
+    return period
+
+
+def fib_pair_mod(n: int, m: int) -> tuple[int, int]:
+    """returns F(n) mod m, F(n+1) mod m"""
+    a, b = 0, 1 % m
+    for bit in f"{n:b}":
+        a, b = a * (2 * b - a) % m, (a * a + b * b) % m
+        if bit == "1":
+            a, b = b, (a + b) % m
+    return a, b
+
+
+def fibonacci_mod(n: int, m: int, *, factors=None) -> int:
+    """F(n) mod m
+
+    If the prime factorisation of m is known (as `PrimeFactor`s), n is first
+    reduced modulo a multiple of the Pisano period of m.
+    """
+    if factors is not None:
+        n %= pisano_multiple(m, factors)
+    return fib_pair_mod(n, m)[0]
+
+
+def fibonacci_mod_many(ns: typing.Sequence[int], ms: typing.Sequence[int] | int):
+    """F(n) mod m for each (n, m) pair (or each n, for a single m), as a NumPy array
+
+    Indices must fit in 64 bits, and moduli below 2^31 (so that every product
+    fits in a uint64).
+    """
+    import numpy as np
+
+    ns = np.asarray(ns, dtype=np.uint64)
+    ms = np.broadcast_to(np.asarray(ms, dtype=np.uint64), ns.shape)
+    if ms.size and (ms.min() == 0 or ms.max() >> np.uint64(31)):
+        raise ValueError("moduli must be in [1, 2^31)")
+
+    a = np.zeros(ns.shape, dtype=np.uint64)
+    b = np.ones(ns.shape, dtype=np.uint64) % ms
+    for shift in range(int(ns.max(initial=0)).bit_length() - 1, -1, -1):
+        c = a * ((2 * b + ms - a) % ms) % ms
+        d = (a * a + b * b) % ms
+        odd = ((ns >> np.uint64(shift)) & np.uint64(1)).astype(bool)
+        a, b = np.where(odd, d, c), np.where(odd, (c + d) % ms, d)
+    return a
+
+
+def random_primes(count: int, *, bits: int = 61) -> list[int]:
+    """`count` distinct random primes of exactly `bits` bits"""
+    primes = set[int]()
+    while len(primes) < count:
+        candidate = random.getrandbits(bits) | (1 << (bits - 1)) | 1
+        if miller(*split(candidate)):
+            primes.add(candidate)
+    return sorted(primes)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("n", metavar="INDEX", type=int, help="desired Fibonacci index")
+    parser.add_argument("m", metavar="MODULUS", type=int, help="modulus")
+
+    args = parser.parse_args()
+    print(fibonacci_mod(args.n, args.m))
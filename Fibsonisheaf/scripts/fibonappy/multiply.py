@@ -0,0 +1,277 @@
+import bisect
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import typing
+
+# Multiplication of big ints, dispatched on the size of the operands.
+#
+# The backends (CPython's `*`, and whichever of gmpy2, NumPy's NTT and float
+# FFT, and the C NTT of `impl/` are available) are timed against each other on
+# operands of growing sizes, each from its own threshold on (below which it
+# would only hand the product back to CPython). The resulting crossover tables
+# (one for `mul`, one for `sqr`) are looked up by the bit length of the smaller
+# operand.
+#
+# Calibrating takes seconds, so it is an explicit step (`make calibrate`, or
+# `python3 -m scripts.fibonappy.multiply`), whose tables are cached on disk
+# for the host and the set of backends. Without them (or once they are stale),
+# the static `default_tables` apply. Below CALIBRATE_BITS, products always stay
+# with CPython.
+#
+# FIBONAPPY_MULTIPLY=name forces a single backend above CALIBRATE_BITS. The C
+# NTT is only used if FIBONAPPY_CNTT gives the path of its library (e.g.
+# `lib/nttt.so`): fibonappy is the reference `bench.py` checks the C
+# implementations against, so by default its products must not depend on them.
+
+CALIBRATE_BITS = 1 << 14
+CALIBRATE_MAX_BITS = 1 << 22
+
+# where `default_tables` switches to the float FFT (without gmpy2)
+DEFAULT_FFT_BITS = 1 << 15
+
+# a backend this many times slower than the best one (and slower than
+# PRUNE_SECONDS) is no longer timed on larger operands
+PRUNE_RATIO = 4
+PRUNE_SECONDS = 0.05
+
+# each timing is the best of (at most) REPEAT runs, within TIME_BUDGET seconds
+REPEAT = 5
+TIME_BUDGET = 0.05
+
+DEFAULT_FOLDER = os.path.join(os.path.expanduser("~"), ".cache", "fibonappy")
+
+Table = list[tuple[int, str]]
+
+
+class Backend(typing.NamedTuple):
+    name: str
+    mul: typing.Callable[[int, int], int]
+    sqr: typing.Callable[[int], int]
+    # identifies the implementation, to tell when the calibration is stale
+    version: str = ""
+    # range of operands (in bits) handled without falling back to CPython
+    min_bits: int = 0
+    max_bits: int | None = None
+
+    def fits(self, nbits: int) -> bool:
+        return self.min_bits <= nbits and (
+            self.max_bits is None or nbits <= self.max_bits
+        )
+
+
+def _int_sqr(x: int) -> int:
+    return x * x
+
+
+BACKENDS = {"int": Backend("int", int.__mul__, _int_sqr)}
+
+_tables: dict[str, Table] | None = None
+
+
+def register(backend: Backend):
+    """make `backend` available (replacing one of the same name)"""
+    global _tables
+    BACKENDS[backend.name] = backend
+    _tables = None
+
+
+def _time(f: typing.Callable, *args) -> float:
+    best = float("inf")
+    deadline = time.perf_counter() + TIME_BUDGET
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        f(*args)
+        end = time.perf_counter()
+        best = min(best, end - start)
+        if end > deadline:
+            break
+    return best
+
+
+def calibrate(*, max_bits: int = CALIBRATE_MAX_BITS, verbose=False) -> dict[str, Table]:
+    """crossover tables of the backends, from CALIBRATE_BITS to `max_bits`
+
+    Each entry `(bits, name)` of a table applies from `bits` on."""
+    rng = random.Random(0)
+    tables = {}
+    for op in ("mul", "sqr"):
+        table = []
+        alive = set(BACKENDS)
+        checked = set()
+        bits = CALIBRATE_BITS
+        while bits <= max_bits:
+            alive = {
+                name
+                for name in alive
+                if not BACKENDS[name].max_bits or bits <= BACKENDS[name].max_bits
+            }
+            running = [
+                name for name in BACKENDS if name in alive and BACKENDS[name].fits(bits)
+            ]
+            if not running:
+                break
+            a = rng.getrandbits(bits) | 1 << (bits - 1)
+            b = rng.getrandbits(bits) | 1 << (bits - 1)
+            args = (a, b) if op == "mul" else (a,)
+            if not checked.issuperset(running):
+                expected = a * b if op == "mul" else a * a
+                for name in set(running) - checked:
+                    checked.add(name)
+                    if getattr(BACKENDS[name], op)(*args) != expected:
+                        alive.discard(name)
+                running = [name for name in running if name in alive]
+
+            times = {
+                name: _time(getattr(BACKENDS[name], op), *args) for name in running
+            }
+            best = min(times, key=times.__getitem__)
+            if verbose:
+                row = "  ".join(f"{name}={t:.2e}s" for name, t in times.items())
+                print(f"{op} {bits:>9} bits: {row}", file=sys.stderr)
+            if not table:
+                table.append((bits, best))
+            elif table[-1][1] != best:
+                # (right past the limit of the previous backend, if it has one)
+                limit = BACKENDS[table[-1][1]].max_bits
+                table.append((bits if limit is None else min(bits, limit + 1), best))
+
+            # prune against the backends that can go on to larger operands
+            bits <<= 1
+            going = [times[name] for name in running if BACKENDS[name].fits(bits)]
+            cutoff = max(PRUNE_RATIO * min(going, default=0), PRUNE_SECONDS)
+            alive -= {name for name in running if times[name] >= cutoff}
+        tables[op] = table
+    return tables
+
+
+def default_tables() -> dict[str, Table]:
+    """crossover tables for hosts without a calibration (from typical timings)"""
+    if "gmpy2" in BACKENDS:
+        table = [(CALIBRATE_BITS, "gmpy2")]
+    elif "fft" in BACKENDS:
+        table = [(DEFAULT_FFT_BITS, "fft"), (BACKENDS["fft"].max_bits + 1, "ntt")]
+    else:
+        table = []
+    return {"mul": table, "sqr": list(table)}
+
+
+def _key() -> dict:
+    return {
+        "python": sys.version,
+        "machine": platform.machine(),
+        "backends": {name: backend.version for name, backend in BACKENDS.items()},
+    }
+
+
+def cache_path(folder: str = DEFAULT_FOLDER) -> str:
+    return os.path.join(folder, f"multiply-{platform.node()}.json")
+
+
+def load(path: str) -> dict[str, Table] | None:
+    """the cached crossover tables, unless they are missing or stale"""
+    try:
+        with open(path) as file:
+            cached = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if cached.get("key") != _key():
+        return None
+    return {op: [tuple(entry) for entry in cached[op]] for op in ("mul", "sqr")}
+
+
+def save(path: str, tables: dict[str, Table]):
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    # (a file of its own, since other processes may be saving at the same time)
+    with tempfile.NamedTemporaryFile(
+        "w", dir=folder, prefix=".multiply-", suffix=".tmp", delete=False
+    ) as file:
+        json.dump({"key": _key(), **tables}, file, indent=1)
+    os.replace(file.name, path)
+
+
+def tables() -> dict[str, Table]:
+    """the crossover tables in use: the cached calibration, or the defaults"""
+    global _tables
+    if _tables is None:
+        forced = os.environ.get("FIBONAPPY_MULTIPLY")
+        if forced:
+            if forced not in BACKENDS:
+                raise ValueError(f"unknown multiplication backend {forced!r}")
+            _tables = {op: [(CALIBRATE_BITS, forced)] for op in ("mul", "sqr")}
+        else:
+            _tables = load(cache_path()) or default_tables()
+    return _tables
+
+
+def backend(op: str, nbits: int) -> Backend:
+    """the backend in use for `op` ("mul" or "sqr") on operands of `nbits` bits"""
+    if nbits < CALIBRATE_BITS:
+        return BACKENDS["int"]
+    table = tables()[op]
+    i = bisect.bisect_right(table, nbits, key=lambda entry: entry[0]) - 1
+    return BACKENDS[table[i][1]] if i >= 0 else BACKENDS["int"]
+
+
+def mul(a: int, b: int) -> int:
+    return backend("mul", min(a.bit_length(), b.bit_length())).mul(a, b)
+
+
+def sqr(a: int) -> int:
+    return backend("sqr", a.bit_length()).sqr(a)
+
+
+try:
+    import gmpy2
+except ModuleNotFoundError:
+    pass
+else:
+
+    def _gmpy2_mul(a: int, b: int) -> int:
+        return int(gmpy2.mpz(a) * gmpy2.mpz(b))
+
+    def _gmpy2_sqr(a: int) -> int:
+        return int(gmpy2.square(gmpy2.mpz(a)))
+
+    register(Backend("gmpy2", _gmpy2_mul, _gmpy2_sqr, gmpy2.version()))
+
+try:
+    from . import fftmul, ntt
+except ModuleNotFoundError:  # numpy is not installed
+    pass
+else:
+    register(Backend("ntt", ntt.mul, ntt.sqr, min_bits=ntt.THRESHOLD_BITS))
+    register(Backend("fft", fftmul.mul, fftmul.sqr, max_bits=fftmul.MAX_BITS))
+
+from . import cntt
+
+_library = os.environ.get("FIBONAPPY_CNTT")
+if _library:
+    _multiplier = cntt.Multiplier(_library)
+    register(Backend("cntt", _multiplier.mul, _multiplier.sqr, _multiplier.version))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Calibrates (and caches) the crossover tables of the backends."
+    )
+    parser.add_argument(
+        "--max-bits",
+        type=int,
+        default=CALIBRATE_MAX_BITS,
+        help="size of the largest operands to time",
+    )
+
+    args = parser.parse_args()
+    print(f"backends: {', '.join(BACKENDS)}", file=sys.stderr)
+    calibrated = calibrate(max_bits=args.max_bits, verbose=True)
+    save(cache_path(), calibrated)
+    for op, table in calibrated.items():
+        print(op, " ".join(f"{name}@{bits}" for bits, name in table))
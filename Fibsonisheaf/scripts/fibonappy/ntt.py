@@ -0,0 +1,159 @@
+import functools
+
+import numpy as np
+
+from .num_theory import find_candidate, get_mod_generator, inverse, log2_floor
+
+# NTT multiplication of big ints, vectorised with NumPy.
+#
+# NumPy has no 128-bit integers, so the single 64-bit prime used by
+# `impl/ntt.c` cannot be multiplied exactly.  Instead, we transform modulo the
+# primes that `find_candidate` picks for 32-, 31- and 30-bit digits (whose
+# products fit in a uint64), and recover the convolution with the CRT.
+
+PRIME_BITS = (32, 31, 30)
+
+PRIMES = [find_candidate(bitlen) for bitlen in PRIME_BITS]
+MODULI = [int(prime) for prime in PRIMES]
+
+# `ROOTS[i]` is a primitive 2^`LOG_MAX`th root of unity modulo `MODULI[i]`
+LOG_MAX = min(prime.even_exp for prime in PRIMES)
+ROOTS = [
+    pow(
+        pow(get_mod_generator(mod), prime.odd_part, mod),
+        1 << (prime.even_exp - LOG_MAX),
+        mod,
+    )
+    for prime, mod in zip(PRIMES, MODULI)
+]
+
+# same rule as `HeaderBase.find_radix`, applied to the CRT modulus
+CRT_MODULUS = MODULI[0] * MODULI[1] * MODULI[2]
+RADIX_BIT = 1 << log2_floor((CRT_MODULUS.bit_length() - 1 - 4) // 2)
+assert RADIX_BIT <= 32, "limbs must be smaller than the primes"
+
+# below this many bits (of the smaller operand), CPython's Karatsuba wins
+THRESHOLD_BITS = 1 << 19
+
+_MOD = np.array(MODULI, dtype=np.uint64).reshape(-1, 1)
+_LIMB = np.dtype(f"<u{RADIX_BIT // 8}")
+_LIMB_MASK = np.uint64((1 << RADIX_BIT) - 1)
+
+
+def _powers(elts: list[int], count: int) -> np.ndarray:
+    """returns `[[elt**j for j in range(count)] for elt in elts]` (modulo each prime)"""
+    pw = np.ones((len(elts), 1), dtype=np.uint64)
+    step = np.array(elts, dtype=np.uint64).reshape(-1, 1)
+    while pw.shape[1] < count:
+        pw = np.concatenate((pw, pw * step % _MOD), axis=1)
+        step = step * step % _MOD
+    return pw[:, :count]
+
+
+@functools.cache
+def _twiddles(log: int, conj: bool) -> np.ndarray:
+    """powers of a primitive 2^`log`th root of unity (or of its inverse)"""
+    roots = [pow(root, 1 << (LOG_MAX - log), mod) for root, mod in zip(ROOTS, MODULI)]
+    if conj:
+        roots = [inverse(root, mod) for root, mod in zip(roots, MODULI)]
+    return _powers(roots, max(1, 1 << (log - 1)))
+
+
+def _spread(x: int, length: int) -> np.ndarray:
+    """split `x` into `length` radix digits, one row per prime"""
+    digits = np.frombuffer(x.to_bytes(length * _LIMB.itemsize, "little"), _LIMB)
+    return np.tile(digits.astype(np.uint64), (len(MODULI), 1)) % _MOD
+
+
+def _ntt(a: np.ndarray, log: int) -> np.ndarray:
+    """in-place decimation-in-frequency NTT (natural order in, bit-reversed out)"""
+    n = 1 << log
+    mod = _MOD[:, :, None]
+    twiddles = _twiddles(log, False)
+    for k in range(log, 0, -1):
+        m = 1 << k
+        blocks = a.reshape(len(MODULI), n >> k, 2, m >> 1)
+        u = blocks[:, :, 0, :]
+        v = blocks[:, :, 1, :]
+        sum_ = (u + v) % mod
+        diff = (u + mod - v) % mod * twiddles[:, None, :: n >> k] % mod
+        blocks[:, :, 0, :] = sum_
+        blocks[:, :, 1, :] = diff
+    return a
+
+
+def _intt(a: np.ndarray, log: int) -> np.ndarray:
+    """in-place decimation-in-time inverse NTT (bit-reversed in, natural out)"""
+    n = 1 << log
+    mod = _MOD[:, :, None]
+    twiddles = _twiddles(log, True)
+    for k in range(1, log + 1):
+        m = 1 << k
+        blocks = a.reshape(len(MODULI), n >> k, 2, m >> 1)
+        u = blocks[:, :, 0, :]
+        v = blocks[:, :, 1, :] * twiddles[:, None, :: n >> k] % mod
+        sum_ = (u + v) % mod
+        diff = (u + mod - v) % mod
+        blocks[:, :, 0, :] = sum_
+        blocks[:, :, 1, :] = diff
+    scale = [inverse(n % mod, mod) for mod in MODULI]
+    a *= np.array(scale, dtype=np.uint64).reshape(-1, 1)
+    a %= _MOD
+    return a
+
+
+def _fold(r: np.ndarray) -> int:
+    """recombine the residues of the convolution, and propagate carries"""
+    p0, p1, p2 = MODULI
+    # Garner's algorithm: c == x0 + p0 * x1 + p0 * p1 * x2
+    x0 = r[0]
+    x1 = (r[1] + np.uint64(p1) - x0 % np.uint64(p1)) % np.uint64(p1)
+    x1 = x1 * np.uint64(inverse(p0, p1)) % np.uint64(p1)
+    t = (x0 + np.uint64(p0 % p2) * x1) % np.uint64(p2)
+    x2 = (r[2] + np.uint64(p2) - t) % np.uint64(p2)
+    x2 = x2 * np.uint64(inverse(p0 * p1 % p2, p2)) % np.uint64(p2)
+
+    def limbs(x: np.ndarray) -> int:
+        """`sum(x[i] << (RADIX_BIT * i))`, for `x[i]` wider than a limb"""
+        total = 0
+        for shift in range(0, 64, RADIX_BIT):
+            part = ((x >> np.uint64(shift)) & _LIMB_MASK).astype(_LIMB)
+            total += int.from_bytes(part.tobytes(), "little") << shift
+        return total
+
+    return limbs(x0) + p0 * limbs(x1) + p0 * p1 * limbs(x2)
+
+
+def _nradix(x: int) -> int:
+    return -(-x.bit_length() // RADIX_BIT)
+
+
+def mul(a: int, b: int) -> int:
+    if min(a.bit_length(), b.bit_length()) < THRESHOLD_BITS:
+        return a * b
+    if (a < 0) != (b < 0):
+        return -mul(abs(a), abs(b))
+    a, b = abs(a), abs(b)
+
+    log = (_nradix(a) + _nradix(b) - 1).bit_length()
+    if log > LOG_MAX:
+        return a * b
+    fa = _ntt(_spread(a, 1 << log), log)
+    fb = _ntt(_spread(b, 1 << log), log)
+    fa *= fb
+    fa %= _MOD
+    return _fold(_intt(fa, log))
+
+
+def sqr(a: int) -> int:
+    if a.bit_length() < THRESHOLD_BITS:
+        return a * a
+    a = abs(a)
+
+    log = (2 * _nradix(a) - 1).bit_length()
+    if log > LOG_MAX:
+        return a * a
+    fa = _ntt(_spread(a, 1 << log), log)
+    fa *= fa
+    fa %= _MOD
+    return _fold(_intt(fa, log))
@@ -0,0 +1,29 @@
+# fibonappy is run both as `scripts.fibonappy` (from the project root) and as a
+# top-level `fibonappy` (from scripts/, e.g. by bench.py), so the autoheader
+# helpers may be reachable under either name.
+try:
+    from ..autoheader.num_theory.euclid import inverse
+    from ..autoheader.num_theory.find_gen import (
+        extract_prime_factors,
+        get_mod_generator,
+    )
+    from ..autoheader.num_theory.find_prime import find_candidate, miller, split
+    from ..autoheader.num_theory.header import log2_floor
+except ImportError:
+    from autoheader.num_theory.euclid import inverse
+    from autoheader.num_theory.find_gen import (
+        extract_prime_factors,
+        get_mod_generator,
+    )
+    from autoheader.num_theory.find_prime import find_candidate, miller, split
+    from autoheader.num_theory.header import log2_floor
+
+__all__ = [
+    "extract_prime_factors",
+    "find_candidate",
+    "get_mod_generator",
+    "inverse",
+    "log2_floor",
+    "miller",
+    "split",
+]
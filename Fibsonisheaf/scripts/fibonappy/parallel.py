@@ -0,0 +1,132 @@
+import concurrent.futures
+import sys
+from multiprocessing.shared_memory import SharedMemory
+
+from .multiply import mul, sqr
+
+# Same recurrence as `fast_double`, but the three independent products of the
+# top `PARALLEL_LEVELS` doubling steps (where almost all the time is spent) are
+# evaluated concurrently.
+#
+# On free-threaded CPython, the products run on threads. Otherwise, they run
+# on worker processes, and operands are exchanged as raw little-endian bytes
+# through shared memory (pickling multi-megabyte ints is slower than the
+# products themselves).
+
+PARALLEL_LEVELS = 4
+
+
+def free_threaded() -> bool:
+    return not getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+def _nbytes(x: int) -> int:
+    return (x.bit_length() + 7) >> 3
+
+
+def _share(x: int) -> SharedMemory:
+    shm = SharedMemory(create=True, size=max(1, _nbytes(x)))
+    shm.buf[: _nbytes(x)] = x.to_bytes(_nbytes(x), "little")
+    return shm
+
+
+def _load(name: str, size: int) -> int:
+    shm = SharedMemory(name)
+    try:
+        return int.from_bytes(shm.buf[:size], "little")
+    finally:
+        shm.close()
+
+
+def _shared_product(operands: list[tuple[str, int]], out: str) -> int:
+    """Runs in a worker process. Returns the size of the product (in bytes)."""
+    xs = [_load(name, size) for name, size in operands]
+    result = mul(*xs) if len(xs) == 2 else sqr(*xs)
+
+    nbytes = _nbytes(result)
+    shm = SharedMemory(out)
+    try:
+        shm.buf[:nbytes] = result.to_bytes(nbytes, "little")
+    finally:
+        shm.close()
+    return nbytes
+
+
+class ProductPool:
+    """Evaluates F(k) * (2*F(k+1) - F(k)), F(k+1)**2 and F(k)**2 concurrently."""
+
+    def __init__(self, *, threads: bool | None = None):
+        self.threads = free_threaded() if threads is None else threads
+        if self.threads:
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=3)
+        else:
+            self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=3)
+
+    def __enter__(self) -> "ProductPool":
+        return self
+
+    def __exit__(self, *exc):
+        self.executor.shutdown()
+
+    def products(self, fh: int, fh1: int) -> tuple[int, int, int]:
+        if self.threads:
+            futures = [
+                self.executor.submit(mul, fh, (fh1 << 1) - fh),
+                self.executor.submit(sqr, fh1),
+                self.executor.submit(sqr, fh),
+            ]
+            return tuple(future.result() for future in futures)
+
+        diff = (fh1 << 1) - fh
+        inputs = [_share(x) for x in (fh, fh1, diff)]
+        shm_fh, shm_fh1, shm_diff = inputs
+        jobs = [
+            (
+                [(shm_fh.name, _nbytes(fh)), (shm_diff.name, _nbytes(diff))],
+                _nbytes(fh) + _nbytes(diff),
+            ),
+            ([(shm_fh1.name, _nbytes(fh1))], 2 * _nbytes(fh1)),
+            ([(shm_fh.name, _nbytes(fh))], 2 * _nbytes(fh)),
+        ]
+        outputs = [SharedMemory(create=True, size=max(1, size)) for _, size in jobs]
+        try:
+            futures = [
+                self.executor.submit(_shared_product, operands, out.name)
+                for (operands, _), out in zip(jobs, outputs)
+            ]
+            sizes = [future.result() for future in futures]
+            return tuple(
+                int.from_bytes(out.buf[:size], "little")
+                for out, size in zip(outputs, sizes)
+            )
+        finally:
+            for shm in inputs + outputs:
+                shm.close()
+                shm.unlink()
+
+
+def fibonacci(n: int, *, levels: int = PARALLEL_LEVELS) -> int:
+    def fib_pair(k: int, depth: int) -> tuple[int, int]:
+        """returns F(k), F(k+1)"""
+        if k <= 1:
+            return (k, 1)
+        fh, fh1 = fib_pair(k >> 1, depth + 1)
+        if depth < levels:
+            fk, sq1, sq = pool.products(fh, fh1)
+            fk1 = sq1 + sq
+        else:
+            fk = mul(fh, (fh1 << 1) - fh)
+            fk1 = sqr(fh1) + sqr(fh)
+        if k & 1:
+            fk, fk1 = fk1, fk + fk1
+        return fk, fk1
+
+    with ProductPool() as pool:
+        return fib_pair(n, 0)[0]
+
+
+if __name__ == "__main__":
+    from . import argparser, main
+
+    args = argparser().parse_args()
+    main(args.fname, args.n, fibonacci, binary=args.binary)
@@ -0,0 +1,58 @@
+import struct
+import typing
+
+# Raw output of the `.hex.out` binaries (with `-b`) and of `fibonappy` (with
+# `--binary`), as written by `hex.c`:
+#   <"FIBRAW"> <u8: version> <'l' or 'b'> <u64: index> <u64: length in bytes>
+# where the character gives the byte order of the two fields that follow it,
+# then the result itself, as little-endian bytes.
+
+MAGIC = b"FIBRAW"
+VERSION = 1
+
+_PREFIX = struct.Struct("6sBc")
+_FIELDS = {b"l": struct.Struct("<QQ"), b"b": struct.Struct(">QQ")}
+HEADER_SIZE = _PREFIX.size + _FIELDS[b"l"].size
+
+
+def write(fp: typing.BinaryIO, index: int, x: int):
+    length = max(1, (x.bit_length() + 7) >> 3)
+    fp.write(_PREFIX.pack(MAGIC, VERSION, b"l"))
+    fp.write(_FIELDS[b"l"].pack(index, length))
+    fp.write(x.to_bytes(length, "little"))
+
+
+def is_raw(buf) -> bool:
+    """whether `buf` starts like a raw output"""
+    return bytes(buf[: len(MAGIC)]) == MAGIC
+
+
+def payload(buf) -> tuple[int, memoryview] | None:
+    """index and (little-endian) result bytes of a raw output, as a view into
+    `buf`, or None if `buf` is not one
+
+    Raises ValueError if the output is truncated (e.g. by a crash)."""
+    if len(buf) < HEADER_SIZE:
+        return None
+    magic, version, endianness = _PREFIX.unpack_from(buf)
+    if magic != MAGIC or version != VERSION or endianness not in _FIELDS:
+        return None
+    index, length = _FIELDS[endianness].unpack_from(buf, _PREFIX.size)
+    if len(buf) < HEADER_SIZE + length:
+        raise ValueError(
+            f"raw output of F({index}) truncated:"
+            f" {len(buf) - HEADER_SIZE} of {length} bytes"
+        )
+    return index, memoryview(buf)[HEADER_SIZE : HEADER_SIZE + length]
+
+
+def read(buf) -> tuple[int, int] | None:
+    """index and result of a raw output, or None if `buf` is not one
+
+    Raises ValueError if the output is truncated."""
+    found = payload(buf)
+    if found is None:
+        return None
+    index, view = found
+    with view:
+        return index, int.from_bytes(view, "little")
@@ -0,0 +1,150 @@
+import typing
+
+from .multiply import mul, sqr
+
+# Terms of constant-coefficient linear recurrences
+#   a(n) = c[0] a(n-1) + c[1] a(n-2) + ... + c[k-1] a(n-k)
+# by Fiduccia's method: with P(x) = x^k - c[0] x^(k-1) - ... - c[k-1], the
+# coefficients of x^n mod P give a(n) as a combination of a(0), ..., a(k-1).
+# x^n mod P is computed by scanning the bits of n, squaring (and shifting)
+# polynomials of k coefficients, and reducing them modulo P.
+#
+# Each square is a single big-int product, by Kronecker substitution: the
+# coefficients are packed into one integer, at a width that fits those of the
+# product (signs included), which goes through `multiply`. That is one product
+# of about k times the size of a term per bit of n, against the k^3 products
+# of a k-by-k matrix power (`impl/fastexp.c`). The reduction only multiplies
+# by the (small) c[i].
+
+Poly = list[int]
+
+
+class Recurrence(typing.NamedTuple):
+    coeffs: tuple[int, ...]
+    initial: tuple[int, ...]
+
+
+FIBONACCI = Recurrence((1, 1), (0, 1))
+LUCAS = Recurrence((1, 1), (2, 1))
+PELL = Recurrence((2, 1), (0, 1))
+TRIBONACCI = Recurrence((1, 1, 1), (0, 0, 1))
+PADOVAN = Recurrence((0, 1, 1), (1, 1, 1))
+
+PRESETS = {
+    "fibonacci": FIBONACCI,
+    "lucas": LUCAS,
+    "pell": PELL,
+    "tribonacci": TRIBONACCI,
+    "padovan": PADOVAN,
+}
+
+
+def _width(a: Poly, b: Poly) -> int:
+    """bytes per coefficient, to pack the product of `a` and `b`"""
+    ma, mb = max(map(abs, a)), max(map(abs, b))
+    bound = max(ma * mb * min(len(a), len(b)), ma, mb)
+    return (bound.bit_length() + 1 + 7) >> 3
+
+
+def _bias(width: int, count: int) -> int:
+    """`sum(1 << (8 * width * i + 8 * width - 1) for i in range(count))`"""
+    return int.from_bytes((b"\0" * (width - 1) + b"\x80") * count, "little")
+
+
+def pack(poly: Poly, width: int) -> int:
+    """`poly` at x = 2^(8 * `width`), for coefficients below 2^(8 * `width` - 1)"""
+    half = 1 << (8 * width - 1)
+    digits = b"".join((c + half).to_bytes(width, "little") for c in poly)
+    return int.from_bytes(digits, "little") - _bias(width, len(poly))
+
+
+def unpack(x: int, width: int, count: int) -> Poly:
+    """the `count` coefficients of `x` packed by `pack`"""
+    half = 1 << (8 * width - 1)
+    digits = (x + _bias(width, count)).to_bytes(width * count, "little")
+    return [
+        int.from_bytes(digits[i : i + width], "little") - half
+        for i in range(0, width * count, width)
+    ]
+
+
+def poly_mul(a: Poly, b: Poly) -> Poly:
+    width = _width(a, b)
+    count = len(a) + len(b) - 1
+    if a is b:
+        return unpack(sqr(pack(a, width)), width, count)
+    return unpack(mul(pack(a, width), pack(b, width)), width, count)
+
+
+def reduce(poly: Poly, coeffs: typing.Sequence[int]) -> Poly:
+    """`poly` modulo x^k - c[0] x^(k-1) - ... - c[k-1]"""
+    k = len(coeffs)
+    poly = list(poly)
+    for d in range(len(poly) - 1, k - 1, -1):
+        top = poly[d]
+        if top:
+            for i, c in enumerate(coeffs, 1):
+                if c:
+                    poly[d - i] += c * top
+    return poly[:k] + [0] * (k - len(poly))
+
+
+def power_of_x(n: int, coeffs: typing.Sequence[int]) -> Poly:
+    """x^n modulo the characteristic polynomial of `coeffs`"""
+    r = reduce([1], coeffs)
+    for i in range(n.bit_length() - 1, -1, -1):
+        if any(r):
+            r = reduce(poly_mul(r, r), coeffs)
+        if n >> i & 1:
+            r = reduce([0] + r, coeffs)
+    return r
+
+
+def term(recurrence: Recurrence, n: int) -> int:
+    """a(n) of `recurrence`"""
+    coeffs, initial = recurrence
+    if len(coeffs) != len(initial):
+        raise ValueError("a recurrence of order k needs k initial terms")
+    if n < len(initial):
+        return initial[n]
+    r = power_of_x(n, coeffs)
+    return sum(mul(ri, ai) for ri, ai in zip(r, initial) if ri and ai)
+
+
+def fibonacci(n: int) -> int:
+    return term(FIBONACCI, n)
+
+
+def _ints(arg: str) -> tuple[int, ...]:
+    return tuple(int(x) for x in arg.split(","))
+
+
+if __name__ == "__main__":
+    from . import argparser, main
+
+    parser = argparser()
+    parser.add_argument(
+        "--preset",
+        choices=PRESETS,
+        default="fibonacci",
+        help="recurrence to compute a term of",
+    )
+    parser.add_argument(
+        "--coeffs",
+        type=_ints,
+        help="coefficients c[0],...,c[k-1] of a(n) = c[0] a(n-1) + ... + c[k-1] a(n-k)"
+        " (instead of a preset)",
+    )
+    parser.add_argument(
+        "--initial", type=_ints, help="initial terms a(0),...,a(k-1), with --coeffs"
+    )
+
+    args = parser.parse_args()
+    if args.coeffs is None:
+        recurrence = PRESETS[args.preset]
+    elif args.initial is None or len(args.initial) != len(args.coeffs):
+        parser.error("--coeffs needs as many --initial terms")
+    else:
+        recurrence = Recurrence(args.coeffs, args.initial)
+
+    main(args.fname, args.n, lambda n: term(recurrence, n), binary=args.binary)
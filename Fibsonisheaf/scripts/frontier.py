@@ -0,0 +1,168 @@
+import math
+import typing
+from dataclasses import dataclass
+
+import sampling
+
+# Search for the largest index that an implementation computes within a time
+# budget (what `eval.c` finds by scanning), in a few dozen runs.
+#
+# The runtimes measured closest to the budget are fitted to each of MODELS
+# (c f(n), by least squares on logarithms), and the best fit predicts where
+# the budget is crossed. Until some index is over budget, the next one is that
+# prediction, but at most GALLOP times the largest index within budget. Then
+# the prediction is kept inside the bracket, aiming a little past it on the
+# side that is still open, and the search falls back to bisection whenever a
+# step failed to halve the bracket, until the bracket is within `tolerance`.
+#
+# Only runs within NEAR of the budget are repeated, until the confidence
+# interval of their median (see `sampling`) is on one side of the budget; a
+# single run is enough to tell on which side the others fall.
+
+MODELS: dict[str, typing.Callable[[float], float]] = {
+    "n log n": lambda n: n * math.log2(n),
+    "n log n log log n": lambda n: n * math.log2(n) * math.log2(math.log2(n)),
+    "n": lambda n: n,
+    "n^1.465": lambda n: n**1.465,  # Toom-3
+    "n^1.585": lambda n: n**1.585,  # Karatsuba
+    "n^2": lambda n: n * n,
+}
+
+START = 1 << 10
+GALLOP = 4
+NEAR = 0.1
+# runs shorter than this fraction of the budget are left out of the fit
+FLOOR = 1e-3
+# number of runs (the closest to the budget) fitted, since the shorter ones
+# are mostly overhead
+FIT_POINTS = 4
+# (log n is not much use below this)
+MIN_INDEX = 16
+
+
+@dataclass
+class Fit:
+    model: str
+    coeff: float
+    # root mean square of the residuals, in log space
+    error: float
+
+    def predict(self, seconds: float) -> float:
+        """index at which the model reaches `seconds`"""
+        f = MODELS[self.model]
+        target = seconds / self.coeff
+        lo, hi = math.log2(MIN_INDEX), 64.0
+        for _ in range(64):
+            mid = (lo + hi) / 2
+            if f(2**mid) < target:
+                lo = mid
+            else:
+                hi = mid
+        return 2**lo
+
+
+def fit(points: typing.Iterable[tuple[int, float]], seconds: float) -> Fit | None:
+    """the best fit of MODELS to the (index, runtime) points closest to `seconds`"""
+    points = [
+        (n, t) for n, t in points if n >= MIN_INDEX and FLOOR * seconds <= t < math.inf
+    ]
+    points.sort(key=lambda p: abs(math.log(p[1] / seconds)))
+    points = points[:FIT_POINTS]
+    if not points:
+        return None
+    best = None
+    for model, f in MODELS.items():
+        logs = [math.log(t) - math.log(f(n)) for n, t in points]
+        mean = sum(logs) / len(logs)
+        error = math.sqrt(sum((x - mean) ** 2 for x in logs) / len(logs))
+        if best is None or error < best.error:
+            best = Fit(model, math.exp(mean), error)
+    return best
+
+
+@dataclass
+class Frontier:
+    # largest index within budget, and smallest one over it (if any)
+    lo: int
+    hi: int | None
+    runs: int
+    fit: Fit | None
+    failed: bool = False
+
+
+async def search(
+    measure: typing.Callable[[int], typing.Awaitable[float | None]],
+    seconds: float,
+    *,
+    settings: sampling.Settings,
+    tolerance: float = 0.01,
+    start: int = START,
+) -> Frontier:
+    """largest index for which `measure` (a runtime, inf over the timeout, or
+    None on failure) stays within `seconds`"""
+    runs = 0
+    times = {}
+
+    async def run(n: int) -> float | None:
+        nonlocal runs
+        runs += 1
+        return await measure(n)
+
+    async def probe(n: int) -> float | None:
+        t = await run(n)
+        if t is None or abs(t - seconds) > NEAR * seconds:
+            return t
+        # repeat until the median is known to be on one side of the budget
+        samples = sampling.Samples([t])
+        while samples.count < settings.max_runs:
+            bounds = samples.interval(settings.confidence)
+            if bounds is not None and not bounds[0] <= seconds <= bounds[1]:
+                break
+            if samples.count >= settings.min_runs and samples.converged(
+                confidence=settings.confidence,
+                width=settings.width,
+                resolution=settings.resolution,
+            ):
+                break
+            t = await run(n)
+            if t is None:
+                return None
+            samples.runtimes.append(t)
+        return samples.median
+
+    def bracket() -> tuple[int, int | None]:
+        hi = min((n for n, t in times.items() if t > seconds), default=None)
+        lo = max(
+            (n for n, t in times.items() if t <= seconds and (hi is None or n < hi)),
+            default=0,
+        )
+        return lo, hi
+
+    n = start
+    last_width = math.inf
+    while True:
+        t = await probe(n)
+        if t is None:
+            return Frontier(*bracket(), runs, fit(times.items(), seconds), True)
+        times[n] = t
+        lo, hi = bracket()
+        found = fit(times.items(), seconds)
+        if hi is not None and hi - lo <= max(1, tolerance * lo):
+            return Frontier(lo, hi, runs, found)
+
+        # aim a little past the prediction, to close the open side
+        guess = None
+        if found is not None:
+            guess = found.predict(seconds)
+            guess *= 1 + tolerance / 2 if t <= seconds else 1 - tolerance / 2
+        if hi is None:
+            n = lo * GALLOP if guess is None else min(guess, lo * GALLOP)
+            n = max(int(n), lo + 1)
+        else:
+            width = hi - lo
+            if guess is not None and width <= last_width / 2:
+                n = min(max(guess, lo + width / 8), hi - width / 8)
+            else:
+                n = lo + width / 2
+            n = min(max(int(n), lo + 1), hi - 1)
+            last_width = width
@@ -1,40 +1,73 @@
 import typing
 
-
-def skip_leading_zeroes(srcs: typing.Iterable[str]):
-    def gen():
-        leading_zero = True
-        for src in srcs:
-            for c in src:
-                if c == "0" and leading_zero:
-                    continue
-                leading_zero = False
-                yield c
-
-    return "".join(gen())
-
-
-def group(fp: typing.TextIO, src: str, *, chunk_width: int, num_chunks: int):
-    char_counter = -len(src) % chunk_width
-    chunk_counter = (-len(src) // chunk_width) % num_chunks
-
-    padding = " ".join("0" * chunk_width for _ in range(chunk_counter))
-    if padding:
-        padding += " "
-    padding += "0" * char_counter
-    fp.write(padding)
-
-    for c in src:
-        fp.write(c)
-        char_counter += 1
-        if char_counter == chunk_width:
-            char_counter = 0
-            chunk_counter += 1
-            if chunk_counter == num_chunks:
-                chunk_counter = 0
-                fp.write("\n")
-            else:
-                fp.write(" ")
+from hexindex import Index, indexed
+from hexsource import hex_digits
+
+# Output is formatted a block of lines at a time: the separators of a block are
+# laid out once, and each block of digits is copied in around them with one
+# strided slice assignment per column of a chunk.
+
+BLOCK_LINES = 1 << 14
+
+
+def _line_writer(
+    fp: typing.BinaryIO, chunk_width: int, num_chunks: int
+) -> typing.Callable[[bytes], None]:
+    """writes up to `BLOCK_LINES` whole lines of digits"""
+    line = bytearray((b"0" * chunk_width + b" ") * num_chunks)
+    line[-1:] = b"\n"
+    out = line * BLOCK_LINES
+
+    def write_lines(digits: bytes):
+        size = len(digits) // (chunk_width * num_chunks) * len(line)
+        for col in range(chunk_width):
+            out[col : size : chunk_width + 1] = digits[col::chunk_width]
+        fp.write(memoryview(out)[:size])
+
+    return write_lines
+
+
+def group(fp: typing.BinaryIO, src: memoryview, *, chunk_width: int, num_chunks: int):
+    if not src:
+        return
+    line_width = chunk_width * num_chunks
+    padding = -len(src) % line_width
+    write_lines = _line_writer(fp, chunk_width, num_chunks)
+
+    write_lines(b"0" * padding + bytes(src[: line_width - padding]))
+    block = line_width * BLOCK_LINES
+    for offset in range(line_width - padding, len(src), block):
+        write_lines(bytes(src[offset : offset + block]))
+
+
+def group_lines(
+    fp: typing.BinaryIO,
+    buf,
+    index: Index,
+    *,
+    first: int,
+    count: int,
+    chunk_width: int,
+    num_chunks: int,
+):
+    """lines `first` to `first + count` of the output of `group`, read through
+    `index`"""
+    line_width = chunk_width * num_chunks
+    padding = -index.ndigits % line_width
+    write_lines = _line_writer(fp, chunk_width, num_chunks)
+
+    stop = min(first + count, (index.ndigits + padding) // line_width)
+    for lo in range(first, stop, BLOCK_LINES):
+        start = lo * line_width - padding
+        end = min(lo + BLOCK_LINES, stop) * line_width - padding
+        digits = index.read(buf, max(0, start), end - max(0, start))
+        write_lines(b"0" * max(0, -start) + digits)
+
+
+def line_of(digit: int, ndigits: int, *, chunk_width: int, num_chunks: int) -> int:
+    """line of the output of `group` that holds digit `digit`"""
+    line_width = chunk_width * num_chunks
+    return (digit + -ndigits % line_width) // line_width
 
 
 if __name__ == "__main__":
@@ -68,16 +101,50 @@ if __name__ == "__main__":
         help="Number of chunks to display in a single line.",
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        "-a",
+        "--at",
+        metavar="K",
+        type=int,
+        help="Start at the line holding digit K (from the most significant). "
+        "Needs an input file, which gets a sidecar index.",
+    )
+    parser.add_argument(
+        "-l",
+        "--lines",
+        metavar="N",
+        type=int,
+        help="Emit at most N lines. Needs an input file, like --at.",
+    )
 
-    source_file = open(args.input) if args.input is not None else sys.stdin
-    output_file = open(args.output, "w") if args.output is not None else sys.stdout
+    args = parser.parse_args()
+    if (args.at is not None or args.lines is not None) and args.input is None:
+        parser.error("--at and --lines need an input file")
 
-    source = skip_leading_zeroes(map(str.strip, source_file))
-    if args.input is not None:
-        source_file.close()
+    output_file = (
+        open(args.output, "wb") if args.output is not None else sys.stdout.buffer
+    )
 
-    group(output_file, source, chunk_width=args.chunk, num_chunks=args.nchunks)
+    if args.at is not None or args.lines is not None:
+        with indexed(args.input) as (buf, index):
+            first = line_of(
+                args.at or 0,
+                index.ndigits,
+                chunk_width=args.chunk,
+                num_chunks=args.nchunks,
+            )
+            group_lines(
+                output_file,
+                buf,
+                index,
+                first=first,
+                count=args.lines if args.lines is not None else index.ndigits,
+                chunk_width=args.chunk,
+                num_chunks=args.nchunks,
+            )
+    else:
+        with hex_digits(args.input) as source:
+            group(output_file, source, chunk_width=args.chunk, num_chunks=args.nchunks)
 
     if args.output is not None:
         output_file.close()
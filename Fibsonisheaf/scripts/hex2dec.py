@@ -1,23 +1,295 @@
+import functools
 import sys
 import typing
+from decimal import MAX_EMAX, MIN_EMIN, ROUND_CEILING, ROUND_FLOOR, Context, Decimal
+
+from fibonappy.fast_double import mul, sqr
+from hexsource import hex_digits, invalid, to_int
 
 sys.set_int_max_str_digits(0)
 
 # too lazy to write a double-dabble in C
 
+# Divide-and-conquer conversion: x < 10^(2^(k+1)) is split with
+# divmod(x, 10^(2^k)), and the quotient and remainder are converted
+# independently. `str` is only used on pieces of at most 2^(LEAF_K+1) digits.
+#
+# CPython's own long division is quadratic (before 3.12), so the division by
+# 10^(2^k) is a Barrett reduction, with a reciprocal computed by Newton's
+# iteration; both only need (fast) multiplications.
+
+LEAF_K = 9
+RECIPROCAL_LEAF_BITS = 1 << 12
+
+# split the top levels into 2^PARALLEL_LEVELS pieces for the process pool
+PARALLEL_LEVELS = 3
+
+LOG10_2 = 0.30102999566398120
+
+# leading digits are first attempted from this many extra hex digits of input,
+# with this many extra decimal digits of working precision
+LEADING_GUARD_HEX = 16
+LEADING_GUARD_DIGITS = 10
+
+# digit ranges that end within this many digits are read off the leading ones
+LEADING_RANGE_DIGITS = 1 << 12
+
+
+@functools.cache
+def pow10(k: int) -> int:
+    """10^(2^k)"""
+    return 10 if k == 0 else sqr(pow10(k - 1))
+
+
+def _reciprocal(d: int, n: int) -> int:
+    """approximates 2^(2n) / d, for d of n bits"""
+    if n <= RECIPROCAL_LEAF_BITS:
+        return (1 << (2 * n)) // d
+
+    # (with some guard bits, so that the error does not grow across levels)
+    h = (n >> 1) + 32
+    r = _reciprocal((d >> (n - h)) + 1, h) << (n - h)
+    # Newton's step: r += r * (1 - d * r / 2^(2n))
+    err = (1 << (2 * n)) - mul(d, r)
+    return r + (mul(r, err) >> (2 * n))
+
+
+@functools.cache
+def reciprocal(k: int) -> int:
+    d = pow10(k)
+    return _reciprocal(d, d.bit_length())
+
+
+def _barrett(x: int, d: int, inv: int) -> tuple[int, int]:
+    """divmod(x, d), for x < 2^(2n), given the reciprocal of d (of n bits)"""
+    n = d.bit_length()
+    q = mul(x >> (n - 1), inv) >> (n + 1)
+    r = x - mul(q, d)
+    while r < 0:
+        q -= 1
+        r += d
+    while r >= d:
+        q += 1
+        r -= d
+    return q, r
+
+
+def divmod_pow10(x: int, k: int) -> tuple[int, int]:
+    """divmod(x, 10^(2^k)), for x < 10^(2^(k+1))"""
+    return _barrett(x, pow10(k), reciprocal(k))
+
+
+def top_level(x: int) -> int:
+    """some k such that x < 10^(2^(k+1))"""
+    ndigits = int(x.bit_length() * LOG10_2) + 2
+    return max(0, (ndigits - 1).bit_length() - 1)
+
+
+def decimal_chunks(x: int, k: int, *, pad: bool) -> typing.Iterator[str]:
+    """decimal digits of x < 10^(2^(k+1)), most significant first
+
+    If `pad`, exactly 2^(k+1) digits are produced."""
+    if k <= LEAF_K:
+        digits = str(x)
+        yield digits.zfill(2 << k) if pad else digits
+        return
+    if pad and x == 0:
+        yield "0" * (2 << k)
+        return
+
+    q, r = divmod_pow10(x, k)
+    if pad or q:
+        yield from decimal_chunks(q, k - 1, pad=pad)
+        yield from decimal_chunks(r, k - 1, pad=True)
+    else:
+        yield from decimal_chunks(r, k - 1, pad=False)
+
+
+def _split(x: int, k: int, levels: int, pad: bool) -> list[tuple[int, int, bool]]:
+    if levels == 0 or k <= LEAF_K:
+        return [(x, k, pad)]
+    q, r = divmod_pow10(x, k)
+    if not pad and not q:
+        return _split(r, k - 1, levels - 1, False)
+    return _split(q, k - 1, levels - 1, pad) + _split(r, k - 1, levels - 1, True)
+
+
+def _convert(piece: tuple[int, int, bool]) -> str:
+    x, k, pad = piece
+    return "".join(decimal_chunks(x, k, pad=pad))
+
+
+def decimal(x: int, *, jobs: int = 1) -> typing.Iterator[str]:
+    """decimal digits of x >= 0, most significant first"""
+    k = top_level(x)
+    if jobs <= 1 or k <= LEAF_K + PARALLEL_LEVELS:
+        yield from decimal_chunks(x, k, pad=False)
+        return
+
+    import concurrent.futures
+
+    pieces = _split(x, k, PARALLEL_LEVELS, False)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(_convert, pieces)
+
+
+def leading_digits(src: memoryview, count: int) -> tuple[str, int] | None:
+    """first `count` decimal digits, and decimal exponent, of the hex digits `src`
+
+    Only the leading hex digits are read: if x = top * 2^shift + low, then the
+    digits of x are those shared by (guarded) decimal approximations of
+    top * 2^shift and (top + 1) * 2^shift. Returns None if the input is too
+    short for this to be worth it, or if the digits never agree.
+
+    Digits past the leading ones are not validated."""
+    ntop = LEADING_GUARD_HEX + int(count / LOG10_2) // 4
+    while ntop < len(src):
+        top = to_int(src[:ntop])
+        shift = 4 * (len(src) - ntop)
+
+        bounds = []
+        for value, rounding in ((top, ROUND_FLOOR), (top + 1, ROUND_CEILING)):
+            ctx = Context(
+                prec=count + LEADING_GUARD_DIGITS,
+                rounding=rounding,
+                Emax=MAX_EMAX,
+                Emin=MIN_EMIN,
+            )
+            bound = ctx.multiply(Decimal(value), ctx.power(2, shift))
+            # `power` is only "almost always" correctly rounded: widen by 1 ulp
+            if rounding == ROUND_FLOOR:
+                bound = ctx.next_minus(bound)
+            else:
+                bound = ctx.next_plus(bound)
+            digits = "".join(map(str, bound.as_tuple().digits)).ljust(count, "0")
+            bounds.append((digits[:count], bound.adjusted()))
+
+        if bounds[0] == bounds[1]:
+            return bounds[0]
+        ntop *= 2
+    return None
+
+
+def digit_count(src: memoryview) -> int:
+    """number of decimal digits of the hex digits `src`"""
+    leading = leading_digits(src, 1)
+    if leading is not None:
+        return leading[1] + 1
+
+    x = to_int(src)
+    # x >= 2^(bit_length - 1), so this undershoots
+    count = max(1, int((x.bit_length() - 1) * LOG10_2))
+    while x >= 10**count:
+        count += 1
+    return count
+
+
+def residue(src: memoryview, count: int) -> int:
+    """x mod 10^count, for the hex digits `src`
+
+    x mod 10^count is accumulated over blocks of hex digits, most significant
+    first, so the cost is one pass over the input with count-digit products."""
+    modulus = 10**count
+    n = modulus.bit_length()
+    if n <= RECIPROCAL_LEAF_BITS:
+        step = 1 << 12
+        reduce = lambda x: x % modulus
+    else:
+        # (r << 4 * step) | block < 2^(2n), as `_barrett` needs
+        step = n >> 2
+        inv = _reciprocal(modulus, n)
+        reduce = lambda x: _barrett(x, modulus, inv)[1]
+
+    r = 0
+    for i in range(0, len(src), step):
+        block = src[i : i + step]
+        r = reduce((r << (4 * len(block))) | to_int(block))
+    return r
+
+
+def trailing_digits(src: memoryview, count: int) -> str:
+    """last `count` decimal digits of the hex digits `src` (all of them, if fewer)"""
+    if len(src) <= count:  # x has at most ~1.2 * count digits
+        return "".join(decimal(to_int(src)))[-count:]
+    return "".join(decimal(residue(src, count))).zfill(count)
+
+
+def _floordiv(x: int, d: int) -> int:
+    """x // d, by a Barrett reduction (with both scaled to suit it)"""
+    if d.bit_length() <= RECIPROCAL_LEAF_BITS:
+        return x // d
+    n = max(d.bit_length(), x.bit_length() - d.bit_length()) + 1
+    shift = n - d.bit_length()
+    return _barrett(x << shift, d << shift, _reciprocal(d << shift, n))[0]
+
+
+def digit_range(src: memoryview, start: int | None, stop: int | None) -> str:
+    """decimal digits `start:stop` (as a slice) of the hex digits `src`
+
+    Windows ending within the first LEADING_RANGE_DIGITS are read off the
+    leading digits. Others are (x // 10^(total - stop)) mod 10^(stop - start),
+    with the residue taken first (on the input, block by block) in the lower
+    half, so that only the digits of the window are converted."""
+    total = digit_count(src)
+    start, stop, _ = slice(start, stop).indices(total)
+    if stop <= start:
+        return ""
+    if stop <= LEADING_RANGE_DIGITS:
+        leading = leading_digits(src, stop)
+        if leading is not None and leading[1] == total - 1:
+            return leading[0][start:stop]
+    if 2 * start >= total:
+        # (a window in the lower half: the residue is the smaller number)
+        window = _floordiv(residue(src, total - start), 10 ** (total - stop))
+    else:
+        window = _floordiv(to_int(src), 10 ** (total - stop)) % 10 ** (stop - start)
+    return "".join(decimal(window)).zfill(stop - start)
+
+
+def hex2dec(
+    fp: typing.TextIO,
+    src: memoryview,
+    *,
+    ndigits: int,
+    jobs: int = 1,
+    tail: int | None = None,
+    window: slice | None = None,
+):
+    if tail is not None or window is not None:
+        try:
+            if tail is not None:
+                fp.write(trailing_digits(src, tail))
+            else:
+                fp.write(digit_range(src, window.start, window.stop))
+        except ValueError:
+            invalid(src)
+        return
+
+    if ndigits > 0:
+        try:
+            leading = leading_digits(src, ndigits + 1)
+        except ValueError:  # reported below
+            leading = None
+        if leading is not None and leading[1] >= ndigits:
+            (lead, *rest), exponent = leading
+            fp.write(lead)
+            fp.write(".")
+            fp.write("".join(rest))
+            fp.write(f"e{exponent}")
+            return
 
-def hex2dec(fp: typing.TextIO, src: str, *, ndigits: int):
     try:
-        x = int(src, base=16)
+        x = to_int(src)
     except ValueError:
-        index, char = next(
-            filter(lambda p: p[1] not in "0123456789abcdef", enumerate(src.lower()))
-        )
-        print(f"Invalid character {char!r} at index {index+1}.", file=sys.stderr)
-        exit(1)
+        invalid(src)
+
+    if ndigits == 0:
+        for chunk in decimal(x, jobs=jobs):
+            fp.write(chunk)
+        return
 
-    dec = str(x)
-    if ndigits == -1 or len(dec) <= ndigits:
+    dec = "".join(decimal(x, jobs=jobs))
+    if len(dec) <= ndigits:
         fp.write(dec)
     else:
         lead, *rest = dec[: ndigits + 1]
@@ -27,6 +299,13 @@ def hex2dec(fp: typing.TextIO, src: str, *, ndigits: int):
         fp.write(f"e{len(dec)-1}")
 
 
+def digit_slice(arg: str) -> slice:
+    start, sep, stop = arg.partition(":")
+    if not sep:
+        raise ValueError(arg)
+    return slice(int(start) if start else None, int(stop) if stop else None)
+
+
 if __name__ == "__main__":
 
     import argparse
@@ -47,20 +326,46 @@ if __name__ == "__main__":
     parser.add_argument(
         "-n",
         "--ndigits",
+        type=int,
         default=32,
         help="Number of digits to emit, or 0 to emit all digits.",
     )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "-t",
+        "--tail",
+        metavar="K",
+        type=int,
+        help="Emit the last K digits only.",
+    )
+    mode.add_argument(
+        "-r",
+        "--range",
+        metavar="I:J",
+        type=digit_slice,
+        help="Emit digits I to J (as a Python slice, from the most significant).",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes for the conversion.",
+    )
 
     args = parser.parse_args()
 
-    source_file = open(args.input) if args.input is not None else sys.stdin
     output_file = open(args.output, "w") if args.output is not None else sys.stdout
 
-    source = "".join(map(str.strip, source_file))
-    if args.input is not None:
-        source_file.close()
-
-    hex2dec(output_file, source, ndigits=args.ndigits)
+    with hex_digits(args.input) as source:
+        hex2dec(
+            output_file,
+            source,
+            ndigits=args.ndigits,
+            jobs=args.jobs,
+            tail=args.tail,
+            window=args.range,
+        )
 
     if args.output is not None:
         output_file.close()
@@ -0,0 +1,187 @@
+import contextlib
+import mmap
+import os
+import re
+import struct
+import sys
+import typing
+import zlib
+from dataclasses import dataclass
+
+from fibonappy import raw
+from hexsource import WHITESPACE, bounds, contiguous, map_file
+
+# Sidecar index of a file of digits (the hex dumps of the implementations, or
+# the output of hex2dec), for random access without reading all of it.
+#
+# FILE.idx holds a header, then one entry per block of `block` digits:
+#   <magic> <u64: size of FILE> <u64: mtime of FILE, in ns> <u64: block>
+#   <u64: number of digits> <u64: offset past the last digit>
+#   { <u64: offset of the first digit of the block> <u32: CRC-32 of it> }
+# Digits are counted from the most significant one, past leading whitespace
+# and zeroes. The index is stale (and rebuilt) once FILE changes.
+
+BLOCK_DIGITS = 1 << 16
+SUFFIX = ".idx"
+
+_MAGIC = b"fibidx01"
+_HEADER = struct.Struct("<8sQQQQQ")
+_ENTRY = struct.Struct("<QI")
+_SEGMENT = re.compile(rb"[^ \t\n\r\v\f]+")
+
+
+@dataclass
+class Index:
+    size: int
+    mtime_ns: int
+    block: int
+    ndigits: int
+    end: int
+    offsets: list[int]
+    checksums: list[int]
+
+    def pack(self) -> bytes:
+        header = _HEADER.pack(
+            _MAGIC, self.size, self.mtime_ns, self.block, self.ndigits, self.end
+        )
+        entries = map(_ENTRY.pack, self.offsets, self.checksums)
+        return header + b"".join(entries)
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "Index | None":
+        if len(data) < _HEADER.size:
+            return None
+        magic, *header = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            return None
+        entries = list(_ENTRY.iter_unpack(memoryview(data)[_HEADER.size :]))
+        return cls(*header, [off for off, _ in entries], [crc for _, crc in entries])
+
+    def block_digits(self, buf, i: int) -> bytes:
+        """digits of block `i`, checked against their checksum"""
+        lo = self.offsets[i]
+        hi = self.offsets[i + 1] if i + 1 < len(self.offsets) else self.end
+        digits = buf[lo:hi]
+        if len(digits) != min(self.block, self.ndigits - i * self.block):
+            digits = digits.translate(None, WHITESPACE)
+        if zlib.crc32(digits) != self.checksums[i]:
+            raise ValueError(f"block {i} does not match its checksum")
+        return digits
+
+    def read(self, buf, start: int, count: int) -> bytes:
+        """digits `start` to `start + count` of `buf`"""
+        start, stop, _ = slice(start, start + count).indices(self.ndigits)
+        if stop <= start:
+            return b""
+        first, last = start // self.block, (stop - 1) // self.block
+        digits = b"".join(self.block_digits(buf, i) for i in range(first, last + 1))
+        return digits[start - first * self.block : stop - first * self.block]
+
+
+def build(buf, st: os.stat_result, *, block: int = BLOCK_DIGITS) -> Index:
+    start, end = bounds(buf)
+    offsets, checksums = [], []
+    if contiguous(buf, start, end):
+        view = memoryview(buf)
+        for lo in range(start, end, block):
+            offsets.append(lo)
+            checksums.append(zlib.crc32(view[lo : min(lo + block, end)]))
+        view.release()
+        ndigits = end - start
+    else:
+        # cut blocks across the whitespace-separated runs of digits
+        ndigits = 0
+        crc = 0
+        for match in _SEGMENT.finditer(buf, start, end):
+            lo, hi = match.span()
+            while lo < hi:
+                if ndigits % block == 0:
+                    if offsets:
+                        checksums.append(crc)
+                    offsets.append(lo)
+                    crc = 0
+                take = min(hi - lo, block - ndigits % block)
+                crc = zlib.crc32(buf[lo : lo + take], crc)
+                lo += take
+                ndigits += take
+        if offsets:
+            checksums.append(crc)
+
+    return Index(st.st_size, st.st_mtime_ns, block, ndigits, end, offsets, checksums)
+
+
+def load(path: str, st: os.stat_result) -> Index | None:
+    """the index of the file at `path`, unless it is missing or stale"""
+    try:
+        with open(path + SUFFIX, "rb") as file:
+            index = Index.unpack(file.read())
+    except FileNotFoundError:
+        return None
+    if index is None or (index.size, index.mtime_ns) != (st.st_size, st.st_mtime_ns):
+        return None
+    return index
+
+
+@contextlib.contextmanager
+def indexed(
+    path: str, *, block: int = BLOCK_DIGITS
+) -> typing.Iterator[tuple[mmap.mmap | bytes, Index]]:
+    """maps the file at `path`, along with its index (which is built if needed)"""
+    with open(path, "rb") as file:
+        buf = map_file(file.fileno()) or b""
+        st = os.fstat(file.fileno())
+
+    # (its payload is binary: there are no digits in the file to index)
+    if raw.is_raw(buf):
+        print(
+            f"{path}: raw output (of `-b`), which cannot be indexed;"
+            " write it as hex digits instead",
+            file=sys.stderr,
+        )
+        exit(1)
+
+    index = load(path, st)
+    if index is None:
+        index = build(buf, st, block=block)
+        tmp = f"{path}{SUFFIX}.tmp"
+        with open(tmp, "wb") as out:
+            out.write(index.pack())
+        os.replace(tmp, path + SUFFIX)
+
+    try:
+        yield buf, index
+    finally:
+        if isinstance(buf, mmap.mmap):
+            buf.close()
+
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", metavar="FILE", nargs="+", help="files to index")
+    parser.add_argument(
+        "--block",
+        type=int,
+        default=BLOCK_DIGITS,
+        help="Number of digits per indexed block.",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Also verify the checksums of every block.",
+    )
+
+    args = parser.parse_args()
+
+    for fname in args.files:
+        with indexed(fname, block=args.block) as (buf, index):
+            if args.check:
+                try:
+                    for i in range(len(index.offsets)):
+                        index.block_digits(buf, i)
+                except ValueError as exc:
+                    print(f"{fname}: {exc}", file=sys.stderr)
+                    exit(1)
+            print(f"{fname}: {index.ndigits} digits in {len(index.offsets)} blocks")
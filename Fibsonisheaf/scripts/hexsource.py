@@ -0,0 +1,149 @@
+import binascii
+import contextlib
+import mmap
+import os
+import re
+import stat
+import sys
+import typing
+
+from fibonappy import raw
+
+# Shared input layer of `hex2dec` and `group_hex`.
+#
+# Files (including a redirected stdin) are mapped rather than read, and piped
+# stdin is read in one go. Whitespace and leading zeroes are skipped by moving
+# the bounds of a memoryview, so the digits are only copied if whitespace is
+# found *inside* them (e.g. if the output was wrapped), which the
+# implementations never do. Raw outputs (`hex.out -b`) are detected, and
+# `IntDigits` then stands for the hex digits of their (little-endian) payload:
+# slices of it are nibble ranges of the mapped bytes, which `to_int` reads
+# straight into an int, so that the cost of reading a window of digits is that
+# of the window, as for text, without formatting or parsing them.
+
+WHITESPACE = b" \t\n\r\v\f"
+
+_LEADING = re.compile(rb"[ \t\n\r\v\f0]*")
+_NON_HEX = re.compile(rb"[^0-9a-fA-F]")
+
+
+def bounds(buf) -> tuple[int, int]:
+    """start and end of the digits of `buf`, past whitespace and leading zeroes"""
+    start = _LEADING.match(buf).end()
+    end = len(buf)
+    while end > start and buf[end - 1] in WHITESPACE:
+        end -= 1
+    return start, end
+
+
+def contiguous(buf, start: int, end: int) -> bool:
+    """whether `buf[start:end]` has no whitespace"""
+    return all(buf.find(bytes([c]), start, end) < 0 for c in WHITESPACE)
+
+
+class IntDigits:
+    """the hex digits of the little-endian bytes `data` (without leading zeroes,
+    unless `length` says otherwise), the last one being nibble `low` of them"""
+
+    def __init__(self, data: memoryview, length: int | None = None, low: int = 0):
+        self.data = data
+        self.low = low
+        if length is None:
+            size = len(data)
+            while size and not data[size - 1]:
+                size -= 1
+            length = 2 * size - (0 < size and data[size - 1] < 0x10)
+        self.length = length
+
+    @property
+    def value(self) -> int:
+        """the int of the digits, read from only the bytes that hold them"""
+        lo, hi = self.low, self.low + self.length
+        x = int.from_bytes(self.data[lo >> 1 : (hi + 1) >> 1], "little")
+        return (x >> (4 * (lo & 1))) & ((1 << (4 * self.length)) - 1)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, key: slice) -> "IntDigits":
+        start, stop, _ = key.indices(self.length)
+        stop = max(start, stop)
+        return IntDigits(self.data, stop - start, self.low + self.length - stop)
+
+    def __bytes__(self) -> bytes:
+        return f"{self.value:0{self.length}x}".encode() if self.length else b""
+
+    def release(self):
+        self.data.release()
+
+
+def _strip(buf) -> memoryview | IntDigits:
+    try:
+        found = raw.payload(buf)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        exit(1)
+    if found is not None:
+        _, payload = found
+        return IntDigits(payload)
+
+    start, end = bounds(buf)
+    if not contiguous(buf, start, end):
+        digits = memoryview(buf)[start:end].tobytes().translate(None, WHITESPACE)
+        return memoryview(digits)[_LEADING.match(digits).end() :]
+    return memoryview(buf)[start:end]
+
+
+def map_file(fileno: int) -> mmap.mmap | None:
+    """read-only map of a whole file, or None if it is empty"""
+    try:
+        return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    except ValueError:  # empty file
+        return None
+
+
+@contextlib.contextmanager
+def hex_digits(path: str | None) -> typing.Iterator[memoryview | IntDigits]:
+    """hex digits of the file at `path` (or of stdin), without whitespace or
+    leading zeroes"""
+    if path is not None:
+        with open(path, "rb") as file:
+            buf = map_file(file.fileno())
+    elif stat.S_ISREG(os.fstat(sys.stdin.fileno()).st_mode):
+        buf = map_file(sys.stdin.fileno())
+    else:
+        yield _strip(sys.stdin.buffer.read())
+        return
+
+    if buf is None:
+        yield memoryview(b"")
+        return
+
+    digits = _strip(buf)
+    try:
+        yield digits
+    finally:
+        digits.release()
+        try:
+            buf.close()
+        except BufferError:  # slices still referenced (e.g. by a traceback)
+            pass
+
+
+def to_int(digits) -> int:
+    """int(digits, base=16), for a bytes-like object of hex digits only"""
+    if isinstance(digits, IntDigits):
+        return digits.value
+    if len(digits) & 1:
+        top = int(bytes(digits[:1]), base=16)
+        return top << (4 * len(digits) - 4) | to_int(digits[1:])
+    return int.from_bytes(binascii.unhexlify(digits), "big")
+
+
+def invalid(digits) -> typing.NoReturn:
+    """reports the first non-hex character of `digits`, and exits"""
+    match = _NON_HEX.search(digits)
+    index = match.start() if match else 0
+    char = bytes(digits[index : index + 4]).decode(errors="replace")[:1]
+    print(f"Invalid character {char!r} at index {index+1}.", file=sys.stderr)
+    exit(1)
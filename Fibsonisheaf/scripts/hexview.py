@@ -0,0 +1,93 @@
+import io
+import sys
+
+from group_hex import group_lines, line_of
+from hexindex import indexed
+
+# Pages through a (huge) file of digits, in the layout of `group_hex`, with the
+# offset of the first digit of each line. Only the blocks on screen are read,
+# through the sidecar index of `hexindex`.
+#
+# Interactively: Enter (or `n`) shows the next page, `p` the previous one, a
+# number jumps to that digit, and `q` quits.
+
+
+def page(buf, index, first: int, *, lines: int, chunk_width: int, num_chunks: int):
+    out = io.BytesIO()
+    group_lines(
+        out,
+        buf,
+        index,
+        first=first,
+        count=lines,
+        chunk_width=chunk_width,
+        num_chunks=num_chunks,
+    )
+    line_width = chunk_width * num_chunks
+    padding = -index.ndigits % line_width
+    width = len(str(index.ndigits))
+    for i, line in enumerate(out.getvalue().decode().splitlines(), first):
+        print(f"{max(0, i * line_width - padding):>{width}}  {line}")
+
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", metavar="FILE", help="File of digits to view.")
+    parser.add_argument(
+        "-a",
+        "--at",
+        metavar="K",
+        type=int,
+        default=0,
+        help="Start at the line holding digit K (from the most significant).",
+    )
+    parser.add_argument(
+        "-l",
+        "--lines",
+        metavar="N",
+        type=int,
+        default=32,
+        help="Number of lines per page.",
+    )
+    parser.add_argument(
+        "--chunk",
+        type=int,
+        default=4,
+        help="Number of characters to group in a single chunk.",
+    )
+    parser.add_argument(
+        "--nchunks",
+        type=int,
+        default=8,
+        help="Number of chunks to display in a single line.",
+    )
+
+    args = parser.parse_args()
+    layout = dict(chunk_width=args.chunk, num_chunks=args.nchunks)
+
+    with indexed(args.input) as (buf, index):
+        nlines = line_of(index.ndigits - 1, index.ndigits, **layout) + 1
+        first = line_of(args.at, index.ndigits, **layout)
+        while True:
+            try:
+                page(buf, index, first, lines=args.lines, **layout)
+            except ValueError as exc:
+                print(f"{args.input}: {exc}", file=sys.stderr)
+                exit(1)
+            if not sys.stdin.isatty():
+                break
+            try:
+                command = input(f"-- {index.ndigits} digits (n/p/digit/q) -- ").strip()
+            except EOFError:
+                break
+            if command == "q":
+                break
+            elif command == "p":
+                first = max(0, first - args.lines)
+            elif command.isdigit():
+                first = line_of(int(command), index.ndigits, **layout)
+            elif first + args.lines < nlines:
+                first += args.lines
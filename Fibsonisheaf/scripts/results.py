@@ -0,0 +1,217 @@
+import csv
+import dataclasses
+import json
+import math
+import os
+import typing
+from dataclasses import dataclass
+
+import sampling
+from rusage import Usage
+
+# Machine-readable benchmark results: one record per executable and index, as
+# JSON lines or CSV (with the same flat fields), and the comparison of a run
+# against a baseline of them.
+#
+# A run is slower than its baseline by the ratio of their medians, which lies
+# between the ratios of the opposite ends of their confidence intervals. It
+# regresses if even the lower of these is beyond the threshold (and the medians
+# are further apart than timings can tell), or if it fails where the baseline
+# did not. Runs are matched by (binary, index), whatever the spelling of the
+# path of the binary (`./bin/x.hex.out`, `bin/x.hex.out` or an absolute one).
+#
+# The Makefile leaves the commands a binary was built with next to it, in
+# `<binary>.flags`: its link, the compilation of its object, and the generation
+# of the header that was compiled in.
+
+OK = "ok"
+
+
+@dataclass
+class Record:
+    index: int
+    binary: str
+    flags: str | None
+    # OK, or how the runs failed (TIMEOUT, INCORRECT, ...)
+    verdict: str
+    runtimes: list[float]
+    median: float | None = None
+    mad: float | None = None
+    min: float | None = None
+    # confidence interval of the median
+    low: float | None = None
+    high: float | None = None
+    # against the reference (negative for slowdowns, as in the table)
+    speedup: float | None = None
+    # median resources used by the runs
+    usage: Usage | None = None
+
+    @classmethod
+    def of(
+        cls,
+        index: int,
+        binary: str,
+        samples: sampling.Samples,
+        *,
+        confidence: float,
+        verdict: str = OK,
+        **kwargs,
+    ) -> "Record":
+        if not samples.runtimes:
+            return cls(index, binary, build_flags(binary), verdict, [], **kwargs)
+        low, high = samples.interval(confidence) or (None, None)
+        return cls(
+            index,
+            binary,
+            build_flags(binary),
+            verdict,
+            samples.runtimes,
+            samples.median,
+            samples.mad,
+            samples.min,
+            low,
+            high,
+            **kwargs,
+        )
+
+
+def build_flags(binary: str) -> str | None:
+    try:
+        with open(f"{binary}.flags") as file:
+            return file.read().strip()
+    except OSError:
+        return None
+
+
+_NUMBERS = ["median", "mad", "min", "low", "high", "speedup"]
+_FIELDS = [field.name for field in dataclasses.fields(Record) if field.name != "usage"]
+_USAGE = [field.name for field in dataclasses.fields(Usage)]
+FIELDS = _FIELDS + [f"usage_{name}" for name in _USAGE]
+
+
+def to_row(record: Record) -> dict:
+    row = {name: getattr(record, name) for name in _FIELDS}
+    for name in _USAGE:
+        row[f"usage_{name}"] = (
+            None if record.usage is None else getattr(record.usage, name)
+        )
+    return row
+
+
+def from_row(row: dict) -> Record:
+    """a record from `to_row`, or from its CSV text"""
+
+    def number(x) -> float | None:
+        return None if x is None or x == "" else float(x)
+
+    runtimes = row["runtimes"]
+    if isinstance(runtimes, str):
+        runtimes = [float(x) for x in runtimes.split()]
+    usage = None
+    if number(row.get("usage_wall")) is not None:
+        usage = Usage(*(number(row[f"usage_{name}"]) for name in _USAGE))
+    return Record(
+        int(row["index"]),
+        row["binary"],
+        row["flags"] or None,
+        row["verdict"],
+        runtimes,
+        usage=usage,
+        **{name: number(row[name]) for name in _NUMBERS},
+    )
+
+
+class Writer:
+    """writes records to `file`, as JSON lines or CSV"""
+
+    def __init__(self, file: typing.TextIO, format: str = "jsonl"):
+        self.file = file
+        self.csv = None
+        if format == "csv":
+            self.csv = csv.DictWriter(file, FIELDS)
+            self.csv.writeheader()
+
+    def write(self, record: Record):
+        row = to_row(record)
+        if self.csv is None:
+            self.file.write(json.dumps(row) + "\n")
+        else:
+            row["runtimes"] = " ".join(map(repr, row["runtimes"]))
+            self.csv.writerow(row)
+        self.file.flush()
+
+
+def load(path: str) -> list[Record]:
+    """records written by `Writer` (CSV if `path` ends in .csv)"""
+    with open(path, newline="") as file:
+        if path.endswith(".csv"):
+            return [from_row(row) for row in csv.DictReader(file)]
+        return [from_row(json.loads(line)) for line in file if line.strip()]
+
+
+@dataclass
+class Change:
+    binary: str
+    index: int
+    baseline: Record
+    current: Record
+    # slowdown: ratio of the medians, and its bounds
+    ratio: float | None
+    low: float | None
+    high: float | None
+    regressed: bool
+
+
+def compare(
+    baseline: typing.Iterable[Record],
+    current: typing.Iterable[Record],
+    *,
+    threshold: float,
+    resolution: float = 0,
+) -> list[Change]:
+    """changes from `baseline` to the `current` runs of the same (binary, index)"""
+    before = {key(record): record for record in baseline}
+    changes = []
+    for record in current:
+        base = before.get(key(record))
+        if base is None:
+            continue
+        ratio = low = high = None
+        if base.verdict == OK and record.verdict == OK:
+            # without intervals (too few runs), the medians stand for them
+            ratio = _div(record.median, base.median)
+            low = _div(_or(record.low, record.median), _or(base.high, base.median))
+            high = _div(_or(record.high, record.median), _or(base.low, base.median))
+            regressed = low > 1 + threshold and record.median - base.median > resolution
+        else:
+            # failing where the baseline did not
+            regressed = base.verdict == OK
+        changes.append(
+            Change(
+                record.binary, record.index, base, record, ratio, low, high, regressed
+            )
+        )
+    return changes
+
+
+def missing(
+    baseline: typing.Iterable[Record], current: typing.Iterable[Record]
+) -> list[Record]:
+    """records of `baseline` without a `current` run of the same (binary, index)"""
+    found = set(map(key, current))
+    return [record for record in baseline if key(record) not in found]
+
+
+def key(record: Record) -> tuple[str, int]:
+    """what runs are matched by"""
+    return os.path.relpath(record.binary), record.index
+
+
+def _or(bound: float | None, median: float) -> float:
+    return median if bound is None else bound
+
+
+def _div(a: float, b: float) -> float:
+    if b == 0:
+        return 1.0 if a == 0 else math.inf
+    return a / b
@@ -0,0 +1,102 @@
+import dataclasses
+import resource
+import statistics
+import typing
+from dataclasses import dataclass
+
+# Resources used by a run: CPU time, peak memory, context switches and page
+# faults, as `getrusage` reports them.
+#
+# Executables are reaped with `os.wait4`, which gives their usage directly.
+# Shared objects run in a long-lived worker (see `cimpl`), which takes the
+# difference of its own usage around each call instead, and reads its peak
+# RSS from /proc after resetting it (so that it is the call's own peak, not
+# that of the worker's lifetime).
+
+
+@dataclass
+class Usage:
+    # wall-clock time the process (or call) took, in seconds
+    wall: float
+    user: float
+    system: float
+    # peak resident set size, in KiB
+    maxrss: int
+    minflt: int
+    majflt: int
+    # voluntary and involuntary context switches
+    nvcsw: int
+    nivcsw: int
+
+    @property
+    def cpu(self) -> float:
+        return self.user + self.system
+
+    @property
+    def parallelism(self) -> float:
+        """CPU time per wall-clock time: about the number of busy threads"""
+        return self.cpu / self.wall if self.wall > 0 else 0.0
+
+    @classmethod
+    def of(cls, usage: resource.struct_rusage, wall: float) -> "Usage":
+        return cls(
+            wall,
+            usage.ru_utime,
+            usage.ru_stime,
+            usage.ru_maxrss,
+            usage.ru_minflt,
+            usage.ru_majflt,
+            usage.ru_nvcsw,
+            usage.ru_nivcsw,
+        )
+
+    @classmethod
+    def between(
+        cls,
+        before: resource.struct_rusage,
+        after: resource.struct_rusage,
+        wall: float,
+        *,
+        maxrss: int,
+    ) -> "Usage":
+        return cls(
+            wall,
+            after.ru_utime - before.ru_utime,
+            after.ru_stime - before.ru_stime,
+            maxrss,
+            after.ru_minflt - before.ru_minflt,
+            after.ru_majflt - before.ru_majflt,
+            after.ru_nvcsw - before.ru_nvcsw,
+            after.ru_nivcsw - before.ru_nivcsw,
+        )
+
+
+def reset_peak():
+    """resets the peak RSS of this process to its current RSS (if supported)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+    except OSError:
+        pass
+
+
+def peak() -> int:
+    """peak RSS of this process since `reset_peak`, in KiB"""
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def median(usages: typing.Sequence[Usage]) -> Usage:
+    """the median of each field of `usages`"""
+    return Usage(
+        *(
+            statistics.median(getattr(usage, field.name) for usage in usages)
+            for field in dataclasses.fields(Usage)
+        )
+    )
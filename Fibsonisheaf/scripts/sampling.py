@@ -0,0 +1,131 @@
+import asyncio
+import math
+import random
+import statistics
+import typing
+from dataclasses import dataclass, field
+
+# Repeated runtime measurements, summarised by order statistics: the median,
+# with a distribution-free confidence interval, the median absolute deviation
+# and the minimum. Unlike the mean, these are not thrown off by the odd slow
+# run.
+#
+# The interval is [x(j), x(n-1-j)] of the n sorted samples, which misses the
+# true median with probability 2 P(B <= j) for B ~ Binomial(n, 1/2); it takes
+# 6 samples to reach 95% confidence at all.
+#
+# `sample` runs each job, after some warmup runs, until its interval is narrow
+# enough. Jobs run concurrently as far as the `scheduler` lets them, and take
+# turns otherwise, starting in a random order (so that drift, e.g. thermal
+# throttling, is spread over all of them).
+
+
+@dataclass
+class Samples:
+    runtimes: list[float] = field(default_factory=list)
+    failed: bool = False
+
+    @property
+    def count(self) -> int:
+        return len(self.runtimes)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.runtimes)
+
+    @property
+    def mad(self) -> float:
+        median = self.median
+        return statistics.median(abs(x - median) for x in self.runtimes)
+
+    @property
+    def min(self) -> float:
+        return min(self.runtimes)
+
+    def interval(self, confidence: float) -> tuple[float, float] | None:
+        """confidence interval of the median, if there are enough samples"""
+        n = self.count
+        j = _rank(n, confidence)
+        if j is None:
+            return None
+        ordered = sorted(self.runtimes)
+        return ordered[j], ordered[n - 1 - j]
+
+    def converged(
+        self, *, confidence: float, width: float, resolution: float = 0
+    ) -> bool:
+        """whether the interval is within `width` (relative to the median), or
+        within `resolution` (in seconds)"""
+        bounds = self.interval(confidence)
+        if bounds is None:
+            return False
+        return bounds[1] - bounds[0] <= max(width * self.median, resolution)
+
+
+def _rank(n: int, confidence: float) -> int | None:
+    """the largest j for which [x(j), x(n-1-j)] has the given confidence"""
+    tail = 0
+    best = None
+    for j in range((n + 1) // 2):
+        tail += math.comb(n, j)
+        if 1 - 2 * tail / 2**n < confidence:
+            break
+        best = j
+    return best
+
+
+def significant(a: Samples, b: Samples, *, confidence: float) -> bool:
+    """whether the confidence intervals of the medians do not overlap"""
+    ia, ib = a.interval(confidence), b.interval(confidence)
+    return ia is not None and ib is not None and (ia[1] < ib[0] or ib[1] < ia[0])
+
+
+@dataclass
+class Settings:
+    warmup: int = 1
+    min_runs: int = 6
+    max_runs: int = 30
+    # relative width of the confidence interval to reach
+    width: float = 0.05
+    # (absolute) width below which timings are noise anyway
+    resolution: float = 1e-4
+    confidence: float = 0.95
+    # stop sampling a job once its runs took this long (past `min_runs`)
+    budget: float = 60.0
+
+
+async def sample(
+    jobs: typing.Mapping[str, typing.Callable[[], typing.Awaitable[float | None]]],
+    settings: Settings,
+    *,
+    rng: random.Random = random,
+) -> dict[str, Samples]:
+    """samples each job (which returns a runtime, or None on failure)"""
+    samples = {name: Samples() for name in jobs}
+
+    def done(name: str) -> bool:
+        s = samples[name]
+        if s.failed or s.count >= settings.max_runs:
+            return True
+        if s.count < settings.min_runs:
+            return False
+        return sum(s.runtimes) >= settings.budget or s.converged(
+            confidence=settings.confidence,
+            width=settings.width,
+            resolution=settings.resolution,
+        )
+
+    async def run(name: str):
+        runs = 0
+        while not done(name):
+            runtime = await jobs[name]()
+            if runtime is None:
+                samples[name].failed = True
+            elif runs >= settings.warmup:
+                samples[name].runtimes.append(runtime)
+            runs += 1
+
+    order = list(jobs)
+    rng.shuffle(order)
+    await asyncio.gather(*map(run, order))
+    return samples
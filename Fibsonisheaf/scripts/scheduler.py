@@ -0,0 +1,179 @@
+import asyncio
+import contextlib
+import os
+import signal
+import subprocess
+import tempfile
+import time
+import typing
+from dataclasses import dataclass
+
+from rusage import Usage
+
+# Runs benchmark jobs concurrently, each pinned to a physical core of its own
+# (with its SMT siblings left idle, so that jobs do not share execution units).
+#
+# Multi-threaded implementations (e.g. `nttt`) would then compete with the
+# other jobs, so they take the whole machine instead: an exclusive job waits
+# for every core to be free, and holds all of them (siblings included) while
+# it runs. Jobs wait for cores in the order they asked for them, and no job
+# jumps ahead of a waiting exclusive one.
+#
+# Children are reaped with `os.wait4`, for their resource usage (asyncio's
+# subprocesses reap them on their own, and drop it): the loop watches a pidfd
+# for their exit, and their output goes to temporary files meanwhile.
+#
+# They are pinned once spawned (not in between fork and exec, which is unsafe
+# with threads around): this only pins their main thread, but the jobs narrowed
+# to a single core are the single-threaded ones, and the others keep the whole
+# machine anyway.
+
+
+def physical_cores() -> list[int]:
+    """one CPU of each physical core this process may run on"""
+    allowed = os.sched_getaffinity(0)
+    cores = []
+    seen = set()
+    for cpu in sorted(allowed):
+        path = f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list"
+        try:
+            with open(path) as file:
+                siblings = frozenset(_cpu_list(file.read()))
+        except OSError:
+            siblings = frozenset([cpu])
+        if siblings not in seen:
+            seen.add(siblings)
+            cores.append(cpu)
+    return cores
+
+
+def _cpu_list(text: str) -> typing.Iterator[int]:
+    """CPUs of a list like `0-3,8,10-11`"""
+    for part in text.strip().split(","):
+        lo, _, hi = part.partition("-")
+        yield from range(int(lo), int(hi or lo) + 1)
+
+
+def threaded(path: str) -> bool:
+    """whether the executable (or shared object) at `path` may spawn threads"""
+    try:
+        with open(path, "rb") as file:
+            return b"pthread_create" in file.read()
+    except OSError:
+        return False
+
+
+@dataclass
+class Completed:
+    returncode: int
+    stdout: bytes
+    stderr: bytes
+    usage: Usage
+
+
+async def _spawn(
+    args: typing.Sequence[str], cpus: set, timeout: float | None
+) -> Completed | None:
+    loop = asyncio.get_running_loop()
+    with tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        proc = subprocess.Popen(args, stdout=stdout, stderr=stderr)
+        with contextlib.suppress(ProcessLookupError):
+            os.sched_setaffinity(proc.pid, cpus)
+        pidfd = os.pidfd_open(proc.pid)
+        exited = asyncio.Event()
+        loop.add_reader(pidfd, exited.set)
+        timed_out = False
+        try:
+            await asyncio.wait_for(exited.wait(), timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+        finally:
+            loop.remove_reader(pidfd)
+            # on timeout, or if this was cancelled
+            if not exited.is_set():
+                signal.pidfd_send_signal(pidfd, signal.SIGKILL)
+            _, status, usage = os.wait4(proc.pid, 0)
+            wall = time.perf_counter() - start
+            os.close(pidfd)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+        if timed_out:
+            return None
+        stdout.seek(0)
+        stderr.seek(0)
+        return Completed(
+            proc.returncode, stdout.read(), stderr.read(), Usage.of(usage, wall)
+        )
+
+
+class Scheduler:
+
+    def __init__(self, cores: typing.Iterable[int] | None = None):
+        self.cores = list(physical_cores() if cores is None else cores)
+        self.machine = os.sched_getaffinity(0)
+        self._free = set(self.cores)
+        self._exclusive_waiting = 0
+        self._changed = asyncio.Condition()
+
+    @contextlib.asynccontextmanager
+    async def acquire(self, *, exclusive: bool = False) -> typing.AsyncIterator[set]:
+        """CPUs to pin a job to: one physical core, or all of them if `exclusive`"""
+        async with self._changed:
+            if exclusive:
+                self._exclusive_waiting += 1
+                try:
+                    await self._changed.wait_for(
+                        lambda: len(self._free) == len(self.cores)
+                    )
+                finally:
+                    self._exclusive_waiting -= 1
+                taken = set(self._free)
+                cpus = set(self.machine)
+            else:
+                await self._changed.wait_for(
+                    lambda: self._free and not self._exclusive_waiting
+                )
+                taken = {min(self._free)}
+                cpus = set(taken)
+            self._free -= taken
+        try:
+            yield cpus
+        finally:
+            async with self._changed:
+                self._free |= taken
+                self._changed.notify_all()
+
+    async def run(
+        self,
+        args: typing.Sequence[str],
+        *,
+        timeout: float | None = None,
+        exclusive: bool = False,
+    ) -> Completed | None:
+        """runs `args` on its own core(s), or returns None if it timed out"""
+        async with self.acquire(exclusive=exclusive) as cpus:
+            return await _spawn(args, cpus, timeout)
+
+    async def call(
+        self,
+        fn: typing.Callable,
+        *args,
+        pid: int = 0,
+        exclusive: bool = False,
+        **kwargs,
+    ):
+        """calls `fn` in a thread, with process `pid` (or the thread) pinned"""
+
+        def pinned(cpus: set):
+            if pid == 0:
+                previous = os.sched_getaffinity(0)
+                os.sched_setaffinity(0, cpus)
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    os.sched_setaffinity(0, previous)
+            os.sched_setaffinity(pid, cpus)
+            return fn(*args, **kwargs)
+
+        async with self.acquire(exclusive=exclusive) as cpus:
+            return await asyncio.to_thread(pinned, cpus)
@@ -0,0 +1,57 @@
+import io
+
+import hex2dec
+import hexsource
+import pytest
+from fibonappy import raw
+
+
+def output(index: int, x: int) -> bytes:
+    fp = io.BytesIO()
+    raw.write(fp, index, x)
+    return fp.getvalue()
+
+
+def test_roundtrip():
+    x = 3**1000
+    assert raw.read(output(1000, x)) == (1000, x)
+
+
+def test_not_raw():
+    assert raw.read(b"1f2e3d") is None
+    assert raw.read(b"") is None
+
+
+def test_truncated():
+    data = output(1000, 3**1000)
+    for size in (raw.HEADER_SIZE, raw.HEADER_SIZE + 1, len(data) - 1):
+        with pytest.raises(ValueError, match="truncated"):
+            raw.read(data[:size])
+
+
+def test_int_digits():
+    for x in (0, 1, 0xF, 0x10, 3**1000, 3**1001 << 8):
+        # (with a zero byte on top, which is not a digit)
+        data = x.to_bytes((x.bit_length() + 7 >> 3) + 1, "little")
+        digits = hexsource.IntDigits(memoryview(data))
+        text = f"{x:x}" if x else ""
+        assert bytes(digits) == text.encode()
+        assert hexsource.to_int(digits) == x
+        for start, stop in ((0, 1), (1, 2), (3, -3), (-7, None), (5, 2), (None, None)):
+            window = digits[start:stop]
+            assert bytes(window) == text[start:stop].encode()
+            assert bytes(window[1:-1]) == text[start:stop][1:-1].encode()
+
+
+def test_hex2dec_raw(tmp_path):
+    x = 3**20000
+    path = tmp_path / "raw"
+    path.write_bytes(output(20000, x))
+    text = str(x)
+    with hexsource.hex_digits(str(path)) as src:
+        assert isinstance(src, hexsource.IntDigits)
+        assert hex2dec.trailing_digits(src, 30) == text[-30:]
+        assert hex2dec.digit_range(src, 100, 140) == text[100:140]
+        assert hex2dec.digit_range(src, 5000, 5040) == text[5000:5040]
+        assert hex2dec.digit_range(src, -60, -20) == text[-60:-20]
+        assert hex2dec.digit_count(src) == len(text)